@@ -11,6 +11,8 @@ MicroPython SSD1306 OLED driver, I2C and SPI interfaces
 * Author(s): Tony DiCola, Michael McWethy
 """
 
+import math
+import struct
 import time
 
 from adafruit_bus_device import i2c_device, spi_device
@@ -21,15 +23,17 @@ try:
     import framebuf
 
     _FRAMEBUF_FORMAT = framebuf.MONO_VLSB
+    _NATIVE_FRAMEBUF = True
 except ImportError:
     # CircuitPython framebuf import
     import adafruit_framebuf as framebuf
 
     _FRAMEBUF_FORMAT = framebuf.MVLSB
+    _NATIVE_FRAMEBUF = False
 
 try:
     # Used only for typing
-    from typing import Optional
+    from typing import Callable, Optional, Sequence
 
     import busio
     import digitalio
@@ -59,6 +63,32 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
 
+# layer compositing operations
+LAYER_OR = const(0)
+LAYER_AND = const(1)
+LAYER_XOR = const(2)
+
+# grayscale conversion methods
+DITHER_THRESHOLD = const(0)
+DITHER_BAYER = const(1)
+DITHER_DIFFUSION = const(2)
+
+# the I2C control byte in front of display data: Co=0, D/C=1
+_I2C_DATA = b"\x40"
+
+
+class _NoLock:
+    """Stands in for the lock of a display used from one thread only"""
+
+    def acquire(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+
+_NO_LOCK = _NoLock()
+
 
 class _SSD1306(framebuf.FrameBuffer):
     """Base class for SSD1306 display driver"""
@@ -72,8 +102,15 @@ class _SSD1306(framebuf.FrameBuffer):
         external_vcc: bool,
         reset: Optional[digitalio.DigitalInOut],
         page_addressing: bool,
+        retries: int = 0,
+        chunk_size: int = 0,
+        yield_hook: Optional[Callable[[], None]] = None,
     ):
-        super().__init__(buffer, width, height, _FRAMEBUF_FORMAT)
+        # without a full framebuffer the buffer holds a single page that is streamed
+        buffer_pages = len(buffer) // width
+        super().__init__(buffer, width, min(height, buffer_pages * 8), _FRAMEBUF_FORMAT)
+        self._fb = buffer
+        self._buffer_pages = buffer_pages
         self.width = width
         self.height = height
         self.external_vcc = external_vcc
@@ -87,16 +124,57 @@ class _SSD1306(framebuf.FrameBuffer):
         # This is necessary because the underlying data buffer is different
         # between I2C and SPI implementations (I2C needs an extra byte).
         self._power = False
+        # Bus error recovery: failed transactions are retried up to `retries` times,
+        # waiting retry_delay, 2*retry_delay, 4*retry_delay... between attempts
+        self.retries = retries
+        self.retry_delay = 0.001
+        self.bus_errors = 0
+        self.bus_retries = 0
+        # narrow displays use centered columns
+        self._col_offset = (128 - self.width) // 2
+        self._window = bytearray(6)
+        # per page, the span of columns changed since the last update; clean when
+        # the first column is after the last
+        self._dirty_first = bytearray(b"\xff" * self.pages)
+        self._dirty_last = bytearray(self.pages)
+        self._layers = []
+        # running estimate of the seconds it takes to send one page
+        self._page_time = 0.0
+        self._memory_mode = None
+        # the column address to segment mapping, as last sent
+        self._remap = 1
+        # a BusTracer recording every transaction, if set
+        self._tracer = None
+        # held around each use of the bus and the buffers that feed it, once
+        # another thread may send too (see `Effects.start_thread`)
+        self._lock = _NO_LOCK
+        # lit pixels per page while there is a power budget, and the contrast
+        # asked for and the contrast in use
+        self._lit = None
+        self._contrast = 0xFF
+        self._applied_contrast = 0xFF
+        self._inverted = False
+        self._over_budget = False
+        # timing registers, as last sent to the controller
+        self._clock_div = 0x80
+        self._precharge = 0x22 if external_vcc else 0xF1
+        # 0.83*Vcc  # n.b. specs for ssd1306 64x32 oled screens imply this should be 0x40
+        self._vcomh = 0x30
+        self._mux = height
+        # the oscillator frequency in Hz at its default setting 8, to estimate refresh rates
+        self.oscillator_hz = 370000
+        # largest number of data bytes per transfer (0 for no limit), and what to
+        # call between transfers
+        self.chunk_size = chunk_size
+        self.yield_hook = yield_hook
         # Parameters for efficient Page Addressing Mode (typical of U8Glib libraries)
         # Important as not all screens appear to support Horizontal Addressing Mode
         if self.page_addressing:
-            self.pagebuffer = bytearray(width + 1)  # type: Optional[bytearray]
-            self.pagebuffer[0] = 0x40  # Set first byte of data buffer to Co=0, D/C=1
             self.page_column_start = bytearray(2)  # type: Optional[bytearray]
             self.page_column_start[0] = self.width % 32
             self.page_column_start[1] = 0x10 + self.width // 32
+            self._page_column = self.width % 32 + (self.width // 32) * 16
         else:
-            self.pagebuffer = None
             self.page_column_start = None
         # Let's get moving!
         self.poweron()
@@ -107,6 +185,29 @@ class _SSD1306(framebuf.FrameBuffer):
         """True if the display is currently powered on, otherwise False"""
         return self._power
 
+    @property
+    def tracer(self) -> Optional["BusTracer"]:
+        """A `BusTracer` recording every transaction, or None. Setting one records
+        the addressing the display was left in, so that a replay starts from it."""
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer: Optional["BusTracer"]) -> None:
+        self._tracer = tracer
+        if tracer is not None and self._memory_mode is not None:
+            state = (
+                SET_MEM_ADDR,
+                self._memory_mode,
+                SET_SEG_REMAP | self._remap,
+                SET_COL_ADDR,
+                self._col_offset,
+                self._col_offset + self.width - 1,
+                SET_PAGE_ADDR,
+                0,
+                self.pages - 1,
+            )
+            tracer.record("s", bytes(state), time.monotonic())
+
     def init_display(self) -> None:
         """Base class to initialize display"""
         # The various screen sizes available with the ssd1306 OLED driver
@@ -130,7 +231,7 @@ class _SSD1306(framebuf.FrameBuffer):
             SET_DISP_START_LINE,
             SET_SEG_REMAP | 0x01,  # column addr 127 mapped to SEG0
             SET_MUX_RATIO,
-            self.height - 1,
+            self._mux - 1,
             SET_COM_OUT_DIR | 0x08,  # scan from COM[N] to COM0
             SET_DISP_OFFSET,
             0x00,
@@ -138,11 +239,11 @@ class _SSD1306(framebuf.FrameBuffer):
             0x02 if self.width > 2 * self.height else 0x12,
             # timing and driving scheme
             SET_DISP_CLK_DIV,
-            0x80,
+            self._clock_div,
             SET_PRECHARGE,
-            0x22 if self.external_vcc else 0xF1,
+            self._precharge,
             SET_VCOM_DESEL,
-            0x30,  # 0.83*Vcc  # n.b. specs for ssd1306 64x32 oled screens imply this should be 0x40
+            self._vcomh,
             # display
             SET_CONTRAST,
             0xFF,  # maximum
@@ -156,6 +257,14 @@ class _SSD1306(framebuf.FrameBuffer):
             SET_DISP | 0x01,  # display on
         ):
             self.write_cmd(cmd)
+        self._memory_mode = 0x10 if self.page_addressing else 0x00
+        self._remap = 1
+        self._contrast = self._applied_contrast = 0xFF
+        self._inverted = False
+        self._col_offset = (128 - self.width) // 2
+        self._orbit = 0
+        self._hidden_cleared = False
+        self.offset = (0, 0)
         self.fill(0)
         self.show()
 
@@ -165,21 +274,271 @@ class _SSD1306(framebuf.FrameBuffer):
         self._power = False
 
     def contrast(self, contrast: int) -> None:
-        """Adjust the contrast"""
+        """Adjust the contrast. With a power budget, this is the most contrast to
+        use; it may be turned down while the screen is bright."""
+        self._contrast = contrast
+        self._set_contrast(contrast if self._lit is None else self._budget_contrast())
+
+    def _set_contrast(self, contrast: int) -> None:
         self.write_cmd(SET_CONTRAST)
         self.write_cmd(contrast)
+        self._applied_contrast = contrast
 
     def invert(self, invert: bool) -> None:
         """Invert all pixels on the display"""
         self.write_cmd(SET_NORM_INV | (invert & 1))
+        self._inverted = bool(invert)
+
+    def set_power_budget(
+        self, budget: Optional[float], *, adjust: bool = True, minimum: int = 16
+    ) -> None:
+        """Keep the estimated panel current within a budget. OLED current grows with
+        the number of lit pixels times the contrast, so the load is estimated as
+        the fraction of pixels lit times contrast / 255. Lit pixels are counted
+        per page with a lookup table, recounting only the pages that change.
+
+        :param budget: the most load to allow, from 0 to 1 (every pixel lit at
+            full contrast), or None to stop budgeting and restore the contrast
+        :param adjust: turn the contrast down (not below minimum) to stay within
+            the budget; otherwise warn when the budget is exceeded
+        :param minimum: the lowest contrast to turn down to
+        """
+        if budget is None:
+            self._lit = None
+            self._set_contrast(self._contrast)
+            return
+        if self._buffer_pages != self.pages:
+            raise ValueError("Power budgeting needs a display with a full framebuffer")
+        self.power_budget = budget
+        self._budget_adjust = adjust
+        self._budget_minimum = minimum
+        self._lit = [
+            _count_lit(self._fb, page * self.width, self.width) for page in range(self.pages)
+        ]
+        self._apply_budget()
+
+    @property
+    def lit_pixels(self) -> int:
+        """The number of lit pixels in the framebuffer"""
+        if self._lit is not None:
+            return sum(self._lit)
+        return _count_lit(self._fb, 0, self._buffer_pages * self.width)
+
+    @property
+    def load(self) -> float:
+        """The estimated panel load, see `set_power_budget`"""
+        lit = self.lit_pixels
+        if self._inverted:
+            lit = self.width * self.height - lit
+        return lit / (self.width * self.height) * self._applied_contrast / 255
+
+    def _budget_contrast(self) -> int:
+        """The contrast that keeps the load within the budget"""
+        lit = sum(self._lit)
+        if self._inverted:
+            lit = self.width * self.height - lit
+        if not self._budget_adjust or not lit:
+            return self._contrast
+        allowed = int(self.power_budget * 255 * self.width * self.height / lit)
+        return max(min(self._contrast, allowed), min(self._budget_minimum, self._contrast))
+
+    def _apply_budget(self) -> None:
+        """Recount the lit pixels of dirty pages and adjust the contrast"""
+        lit = self._lit
+        first = self._dirty_first
+        last = self._dirty_last
+        width = self.width
+        for page in range(self.pages):
+            if first[page] <= last[page]:
+                lit[page] = _count_lit(self._fb, page * width, width)
+        contrast = self._budget_contrast()
+        if contrast != self._applied_contrast:
+            self._set_contrast(contrast)
+        over = self.load > self.power_budget + 0.5 / 255
+        if over and not self._over_budget:
+            message = f"display load {self.load:.3f} exceeds the power budget {self.power_budget}"
+            try:
+                import warnings  # noqa: PLC0415
+
+                warnings.warn(message, stacklevel=3)
+            except ImportError:
+                print(message)
+        self._over_budget = over
 
     def rotate(self, rotate: bool) -> None:
-        """Rotate the display 0 or 180 degrees"""
+        """Rotate the display 0 or 180 degrees. See `RotatedFrameBuffer` for 90 and
+        270 degrees."""
         self.write_cmd(SET_COM_OUT_DIR | ((rotate & 1) << 3))
         self.write_cmd(SET_SEG_REMAP | (rotate & 1))
+        self._remap = rotate & 1
         # com output (vertical mirror) is changed immediately
         # you need to call show() for the seg remap to be visible
 
+    @property
+    def timing(self) -> dict:
+        """The current timing settings, see `set_timing`"""
+        return {
+            "divide": (self._clock_div & 0x0F) + 1,
+            "oscillator": self._clock_div >> 4,
+            "precharge": (self._precharge & 0x0F, self._precharge >> 4),
+            "vcomh": self._vcomh,
+            "mux": self._mux,
+        }
+
+    def set_timing(
+        self,
+        *,
+        divide: Optional[int] = None,
+        oscillator: Optional[int] = None,
+        precharge: Optional[tuple] = None,
+        vcomh: Optional[int] = None,
+        mux: Optional[int] = None,
+    ) -> None:
+        """Change the panel timing. Settings left as None are kept, and all changes
+        are sent in one transaction.
+
+        :param divide: the display clock divide ratio, 1 to 16
+        :param oscillator: the oscillator frequency setting, 0 to 15 (8 by default);
+            higher is faster
+        :param precharge: the (phase 1, phase 2) pre-charge periods in display
+            clocks, each 1 to 15
+        :param vcomh: the VCOMH deselect level register value: 0x00 (0.65*Vcc),
+            0x20 (0.77*Vcc) or 0x30 (0.83*Vcc)
+        :param mux: the number of rows driven, 16 to 64; driving fewer rows than
+            the display has leaves the rest dark but refreshes faster
+        """
+        clock_div = self._clock_div
+        if divide is not None:
+            if not 1 <= divide <= 16:
+                raise ValueError("divide must be 1 to 16")
+            clock_div = (clock_div & 0xF0) | (divide - 1)
+        if oscillator is not None:
+            if not 0 <= oscillator <= 15:
+                raise ValueError("oscillator must be 0 to 15")
+            clock_div = (clock_div & 0x0F) | oscillator << 4
+        charge = self._precharge
+        if precharge is not None:
+            if not all(1 <= phase <= 15 for phase in precharge):
+                raise ValueError("precharge phases must be 1 to 15")
+            charge = precharge[0] | precharge[1] << 4
+        if vcomh is None:
+            vcomh = self._vcomh
+        elif vcomh not in {0x00, 0x20, 0x30}:
+            raise ValueError("vcomh must be 0x00, 0x20 or 0x30")
+        if mux is None:
+            mux = self._mux
+        elif not 16 <= mux <= 64:
+            raise ValueError("mux must be 16 to 64")
+        self.write_cmds(
+            bytes(
+                (
+                    SET_DISP_CLK_DIV,
+                    clock_div,
+                    SET_PRECHARGE,
+                    charge,
+                    SET_VCOM_DESEL,
+                    vcomh,
+                    SET_MUX_RATIO,
+                    mux - 1,
+                )
+            )
+        )
+        self._clock_div = clock_div
+        self._precharge = charge
+        self._vcomh = vcomh
+        self._mux = mux
+
+    @property
+    def refresh_rate(self) -> float:
+        """An estimate of the panel refresh rate in Hz for the current timing:
+        Fosc / (D * K * MUX), where K is the pre-charge phases plus 50 clocks.
+        Calibrate `oscillator_hz` for a better estimate."""
+        return _refresh_rate(self.oscillator_hz, self._clock_div, self._precharge, self._mux)
+
+    def tune_refresh_rate(self, rate: float, *, mux: Optional[int] = None) -> float:
+        """Pick the oscillator setting and divide ratio that bring the refresh rate
+        closest to rate Hz (e.g. a multiple of the animation frame rate), keeping
+        the pre-charge periods, and apply them. Returns the estimated rate.
+
+        :param mux: the number of rows to drive, the display height by default
+        """
+        if mux is None:
+            mux = self._mux
+        best = None
+        for divide in range(1, 17):
+            for oscillator in range(16):
+                clock_div = oscillator << 4 | (divide - 1)
+                error = abs(
+                    _refresh_rate(self.oscillator_hz, clock_div, self._precharge, mux) - rate
+                )
+                if best is None or error < best[0]:
+                    best = (error, divide, oscillator)
+        self.set_timing(divide=best[1], oscillator=best[2], mux=mux)
+        return self.refresh_rate
+
+    def move(self, x: int, y: int) -> None:
+        """Move the image on the panel by x columns and y rows, e.g. against burn
+        in, without changing drawing coordinates. Vertical moves only set the
+        display start line, so the rows pushed off one edge come back at the
+        other. Horizontal moves need margin columns, so they are limited to
+        displays narrower than 128 pixels with horizontal addressing; they send
+        the frame again."""
+        if self.page_addressing:
+            x = 0
+        margin = (128 - self.width) // 2
+        x = min(max(x, -margin), 128 - self.width - margin)
+        old_x, old_y = self.offset
+        if y != old_y:
+            if not self._hidden_cleared and self.height < 64:
+                # blank the rows of RAM beyond the display that come into view;
+                # nothing draws there, so once is enough
+                self._clear_ram(0, 127, self.pages, 7)
+                self._hidden_cleared = True
+            self.write_cmd(SET_DISP_START_LINE | (-y & 0x3F))
+        if x != old_x:
+            # clear the columns left behind
+            if x > old_x:
+                self._clear_ram(margin + old_x, margin + x - 1, 0, self.pages - 1)
+            else:
+                self._clear_ram(
+                    margin + x + self.width, margin + old_x + self.width - 1, 0, self.pages - 1
+                )
+            self._col_offset = margin + x
+            self.show()
+        self.offset = (x, y)
+
+    def orbit(self, radius: int = 1) -> None:
+        """Move the image to the next position of a pixel orbit within radius of
+        where it was drawn. Call it every few minutes to spread the wear of a
+        static screen. The orbit sweeps the rows before moving a column, so most
+        steps cost a single command byte."""
+        columns = radius if self.width < 128 and not self.page_addressing else 0
+        path = []
+        for column in range(-columns, columns + 1):
+            rows = range(-radius, radius + 1)
+            path.extend((column, row) for row in (rows if column % 2 else reversed(rows)))
+        # there and back again, one pixel per step, starting where it was drawn
+        path += path[-2:0:-1]
+        self._orbit += 1
+        self.move(*path[(self._orbit + path.index((0, 0))) % len(path)])
+
+    def _clear_ram(self, first_column: int, last_column: int, first_page: int, last_page: int):
+        """Write zeros to a rectangle of the display RAM, outside the framebuffer"""
+        if first_column > last_column or first_page > last_page:
+            return
+        if self.page_addressing:
+            count = last_column - first_column + 1
+            for page in range(first_page, last_page + 1):
+                self.write_cmds(bytes((0xB0 + page, first_column & 0x0F, 0x10 | first_column >> 4)))
+                self._send_buffer(bytearray(count + 1), count + 1)
+            return
+        self._set_memory_mode(0x00)
+        self.write_cmds(
+            bytes((SET_COL_ADDR, first_column, last_column, SET_PAGE_ADDR, first_page, last_page))
+        )
+        count = (last_column - first_column + 1) * (last_page - first_page + 1)
+        self._send_buffer(bytearray(count + 1), count + 1)
+
     def write_framebuf(self) -> None:
         """Derived class must implement this"""
         raise NotImplementedError
@@ -188,6 +547,320 @@ class _SSD1306(framebuf.FrameBuffer):
         """Derived class must implement this"""
         raise NotImplementedError
 
+    def write_cmds(self, cmds: bytes) -> None:
+        """Send several command bytes in a single bus transaction"""
+        self._send_commands(cmds, len(cmds))
+
+    def _write_commands(self, cmds: bytes, end: int) -> None:
+        """Derived class must implement this: send cmds[:end] in one transaction"""
+        raise NotImplementedError
+
+    def _write_data(self, start: int, end: int) -> None:
+        """Derived class must implement this: send framebuffer bytes start..end-1"""
+        raise NotImplementedError
+
+    def _write_buffer(self, buf: bytearray, end: int) -> None:
+        """Derived class must implement this: send buf[1:end] as display data.
+        buf[0] is free for a control byte."""
+        raise NotImplementedError
+
+    def _set_memory_mode(self, mode: int) -> None:
+        """Switch the memory addressing mode, if it is not already set"""
+        if mode != self._memory_mode:
+            self.write_cmds(bytes((SET_MEM_ADDR, mode)))
+            self._memory_mode = mode
+
+    def _write_window(self, window: bytearray, count: int, start: int, end: int) -> None:
+        """Send window[:count] as commands, then framebuffer bytes start..end-1"""
+        self._write_commands(window, count)
+        self._write_data(start, end)
+
+    def _bus_error(self, error: OSError, attempt: int) -> None:
+        """Account for a failed bus transaction, re-raising it once retries run out"""
+        self.bus_errors += 1
+        if attempt >= self.retries:
+            raise error
+        self.bus_retries += 1
+        time.sleep(self.retry_delay * (1 << attempt))
+
+    # The senders below retry bus errors as configured by `retries`, holding the
+    # lock. Each calls its writer directly, as passing a bound method and its
+    # arguments on would allocate on every call.
+
+    def _send_commands(self, cmds: bytes, end: int) -> None:
+        """Send cmds[:end] as commands"""
+        self._lock.acquire()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    self._write_commands(cmds, end)
+                    return
+                except OSError as error:
+                    self._bus_error(error, attempt)
+                    attempt += 1
+        finally:
+            self._lock.release()
+
+    def _send_data(self, start: int, end: int) -> None:
+        """Send framebuffer bytes start..end-1 as display data"""
+        self._lock.acquire()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    self._write_data(start, end)
+                    return
+                except OSError as error:
+                    self._bus_error(error, attempt)
+                    attempt += 1
+        finally:
+            self._lock.release()
+
+    def _send_buffer(self, buf: bytearray, end: int) -> None:
+        """Send buf[1:end] as display data"""
+        self._lock.acquire()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    self._write_buffer(buf, end)
+                    return
+                except OSError as error:
+                    self._bus_error(error, attempt)
+                    attempt += 1
+        finally:
+            self._lock.release()
+
+    def _write_region(self, first: int, last: int, start: int, end: int) -> None:
+        """Send columns start..end of pages first..last; a region spanning several
+        pages must be the full width. With a chunk_size the region is split into
+        transfers of at most that many bytes, each with its own address window, and
+        the bus is free for other devices in between."""
+        chunk = self.chunk_size
+        if not chunk or (last - first + 1) * (end - start + 1) <= chunk:
+            self._write_chunk(first, last, start, end)
+            return
+        if start == 0 and end == self.width - 1 and chunk >= self.width:
+            step = chunk // self.width
+            pieces = [
+                (page, min(page + step - 1, last), start, end)
+                for page in range(first, last + 1, step)
+            ]
+        else:
+            pieces = [
+                (page, page, column, min(column + chunk - 1, end))
+                for page in range(first, last + 1)
+                for column in range(start, end + 1, chunk)
+            ]
+        for index, piece in enumerate(pieces):
+            if index:
+                self._yield_bus()
+            self._write_chunk(*piece)
+
+    def _yield_bus(self) -> None:
+        """Let others use the bus between chunks"""
+        if self.yield_hook:
+            self.yield_hook()
+        else:
+            time.sleep(0)
+
+    def _write_chunk(self, first: int, last: int, start: int, end: int) -> None:
+        """Send one region in one transfer. If it fails, the address window is
+        re-established and only this region is sent again."""
+        self._lock.acquire()
+        try:
+            window = self._window
+            if self.page_addressing:
+                column = self._page_column + start
+                window[0] = 0xB0 + first
+                window[1] = column & 0x0F
+                window[2] = 0x10 | column >> 4
+                count = 3
+            else:
+                self._set_memory_mode(0x00)
+                window[0] = SET_COL_ADDR
+                window[1] = self._col_offset + start
+                window[2] = self._col_offset + end
+                window[3] = SET_PAGE_ADDR
+                window[4] = first
+                window[5] = last
+                count = 6
+            attempt = 0
+            while True:
+                offset = first % self._buffer_pages * self.width
+                try:
+                    self._write_window(
+                        window,
+                        count,
+                        offset + start,
+                        offset + (last - first) * self.width + end + 1,
+                    )
+                    return
+                except OSError as error:
+                    self._bus_error(error, attempt)
+                    attempt += 1
+        finally:
+            self._lock.release()
+
+    def fill(self, color: int) -> None:
+        """Fill the entire framebuffer with the specified color: any color but 0
+        lights every pixel. Done by MicroPython's native framebuf where there is
+        one, otherwise a byte at a time, as copying slices would allocate."""
+        if _NATIVE_FRAMEBUF:
+            super().fill(1 if color else 0)
+            return
+        buffer = self._fb
+        value = 0xFF if color else 0x00
+        for index in range(self._buffer_pages * self.width):
+            buffer[index] = value
+
+    def scroll(self, delta_x: int, delta_y: int) -> None:
+        """Shift the framebuffer contents by delta_x, delta_y pixels and mark the
+        moved area dirty. As with framebuf, the area left uncovered keeps its old
+        pixels. MicroPython's native scroll does the moving where it exists;
+        otherwise whole rows of bytes are sliced for horizontal moves and moves
+        by multiples of 8 rows, and other vertical moves combine the bits of
+        two source pages a byte at a time."""
+        width = self.width
+        pages = min(self.pages, self._buffer_pages)
+        if abs(delta_x) >= width or abs(delta_y) >= pages * 8 or not (delta_x or delta_y):
+            return
+        # the destination rectangle
+        x_0 = max(delta_x, 0)
+        count = width - abs(delta_x)
+        y_0 = max(delta_y, 0)
+        y_1 = pages * 8 + min(delta_y, 0)
+        if _NATIVE_FRAMEBUF:
+            super().scroll(delta_x, delta_y)
+            self.mark_dirty(x_0, y_0, count, y_1 - y_0)
+            return
+        buf = self._fb
+        # process pages in the order that reads every source before it is overwritten
+        for page in range(pages - 1, -1, -1) if delta_y > 0 else range(pages):
+            start = page * width + x_0
+            if not delta_y & 7:
+                source = page - (delta_y >> 3)
+                if 0 <= source < pages:
+                    source = source * width + x_0 - delta_x
+                    buf[start : start + count] = buf[source : source + count]
+                continue
+            # only the destination rows of this page change
+            keep = (0xFF << max(y_0 - page * 8, 0)) & (0xFF >> max(page * 8 + 8 - y_1, 0))
+            keep = ~keep & 0xFF
+            if keep != 0xFF:
+                _scroll_page(buf, width, pages, page, delta_x, delta_y, x_0, count, keep)
+        self.mark_dirty(x_0, y_0, count, y_1 - y_0)
+
+    def mark_dirty(self, x: int, y: int, width: int, height: int) -> None:
+        """Mark a rectangle of the framebuffer as changed, so that it is sent by the
+        next ``show(partial=True)``"""
+        _mark_spans(self._dirty_first, self._dirty_last, self, x, y, width, height)
+
+    def add_layer(self, op: int = LAYER_OR) -> "Layer":
+        """Add a `Layer` on top of the existing ones. Once there are layers, every
+        update composites the pages they changed into the framebuffer, so draw on
+        the layers rather than on the display.
+
+        :param op: how the layer combines with those below: `LAYER_OR`,
+            `LAYER_AND` or `LAYER_XOR`
+        """
+        layer = Layer(self.width, self.height, op)
+        self._layers.append(layer)
+        return layer
+
+    def remove_layer(self, layer: "Layer") -> None:
+        """Remove a layer, uncovering what is below it"""
+        layer.visible = False
+        self._compose()
+        self._layers.remove(layer)
+
+    def save_region(self, x: int, y: int, width: int, height: int) -> tuple:
+        """Save the framebuffer under a rectangle, e.g. before drawing a popup over
+        it. The saved bytes are whole pages high."""
+        return _save_region(self._fb, self.width, self.height, x, y, width, height)
+
+    def restore_region(self, saved: tuple) -> None:
+        """Put back a region saved with `save_region` and mark it to be sent"""
+        self.mark_dirty(*_restore_region(self._fb, self.width, saved))
+
+    @property
+    def array(self):
+        """The framebuffer as a NumPy uint8 array of shape (pages, width), sharing
+        its memory: bit n of each byte is row n of the page. Call `mark_dirty`
+        after writing to it."""
+        import numpy as np  # noqa: PLC0415
+
+        return np.frombuffer(self._fb, np.uint8).reshape(self._buffer_pages, self.width)
+
+    def bits(self) -> "_Bits":
+        """A context manager giving the pixels as a NumPy bool array of shape
+        (height, width). On exit the pages with changed pixels are packed back into
+        the framebuffer and the changed columns marked to be sent:
+
+        .. code-block:: python
+
+            with display.bits() as pixels:
+                pixels[heat > 0.5] = True
+            display.show(partial=True)
+        """
+        return _Bits(self)
+
+    def image_gray(self, source, *, dither: int = DITHER_BAYER, threshold: int = 128) -> None:
+        """Convert 8-bit grayscale to 1-bit pixels in bulk, straight into the
+        framebuffer. NumPy is used when available.
+
+        :param source: a PIL image in mode L, a NumPy array of shape
+            (height, width), or ``width * height`` bytes, row by row
+        :param dither: `DITHER_THRESHOLD`, `DITHER_BAYER` (8x8 ordered dither)
+            or `DITHER_DIFFUSION` (Floyd-Steinberg error diffusion)
+        :param threshold: the gray level from which `DITHER_THRESHOLD` lights a pixel
+        """
+        width = self.width
+        height = self.height
+        if hasattr(source, "mode"):
+            if source.mode != "L":
+                raise ValueError("Image must be in mode L.")
+            if source.size != (width, height):
+                raise ValueError(f"Image must be same dimensions as display ({width}x{height}).")
+            if dither == DITHER_DIFFUSION:
+                # Pillow diffuses in C
+                _image1_to_vlsb(source.convert("1"), self._fb)
+                self.mark_dirty(0, 0, width, height)
+                return
+            source = source.tobytes()
+        self._fb[:] = _gray_to_vlsb(source, width, height, dither, threshold)
+        self.mark_dirty(0, 0, width, height)
+
+    def _compose(self) -> None:
+        """Combine the layers into the framebuffer for the columns they changed"""
+        width = self.width
+        buffer = self._fb
+        layers = [layer for layer in self._layers if layer.visible]
+        for page in range(self.pages):
+            start = 0xFF
+            end = 0
+            for layer in self._layers:
+                start = min(start, layer._dirty_first[page])
+                end = max(end, layer._dirty_last[page])
+                layer._dirty_first[page] = 0xFF
+                layer._dirty_last[page] = 0
+            if start > end:
+                continue
+            row = page * width
+            # byte by byte, as not every port has integers wide enough for a row
+            for column in range(row + start, row + end + 1):
+                pixels = 0
+                for layer in layers:
+                    if layer.op == LAYER_AND:
+                        pixels &= layer.buffer[column]
+                    elif layer.op == LAYER_XOR:
+                        pixels ^= layer.buffer[column]
+                    else:
+                        pixels |= layer.buffer[column]
+                buffer[column] = pixels
+            self.mark_dirty(start, page * 8, end - start + 1, 8)
+
     def poweron(self) -> None:
         "Reset device and turn on the display."
         if self.reset_pin:
@@ -200,23 +873,83 @@ class _SSD1306(framebuf.FrameBuffer):
         self.write_cmd(SET_DISP | 0x01)
         self._power = True
 
-    def show(self) -> None:
-        """Update the display"""
-        if not self.page_addressing:
-            xpos0 = 0
-            xpos1 = self.width - 1
-            if self.width != 128:
-                # narrow displays use centered columns
-                col_offset = (128 - self.width) // 2
-                xpos0 += col_offset
-                xpos1 += col_offset
-            self.write_cmd(SET_COL_ADDR)
-            self.write_cmd(xpos0)
-            self.write_cmd(xpos1)
-            self.write_cmd(SET_PAGE_ADDR)
-            self.write_cmd(0)
-            self.write_cmd(self.pages - 1)
-        self.write_framebuf()
+    def show(
+        self,
+        *,
+        partial: bool = False,
+        deadline: Optional[float] = None,
+        priorities: Optional[Sequence[tuple]] = None,
+    ) -> bool:
+        """Update the display
+
+        :param partial: only send the regions marked with `mark_dirty` since the
+            last update, instead of the whole framebuffer
+        :param deadline: a `time.monotonic` time by which to stop sending. Pages
+            that would not be done in time stay marked for the next call.
+        :param priorities: ``(y, height, priority)`` regions; pages under higher
+            priorities are sent first, the rest have priority 0
+        :return: True once everything has been sent
+
+        Without a full framebuffer the single page is repeated on every page, so
+        ``fill()`` and ``show()`` still clear the screen.
+        """
+        if self._tracer:
+            self._tracer.frame()
+        if self._layers:
+            self._compose()
+        if not partial:
+            self.mark_dirty(0, 0, self.width, self.height)
+        if self._lit is not None:
+            self._apply_budget()
+        if deadline is not None or priorities is not None:
+            return self._show_by_priority(deadline, priorities or ())
+        first = self._dirty_first
+        last = self._dirty_last
+        full = self.width - 1
+        contiguous = self._buffer_pages == self.pages and not self.page_addressing
+        sent_any = False
+        page = 0
+        while page < self.pages:
+            start = first[page]
+            end = last[page]
+            if start > end:
+                page += 1
+                continue
+            run = page
+            if start == 0 and end == full and contiguous:
+                # whole-width pages are contiguous, so send them in one transfer
+                while run + 1 < self.pages and first[run + 1] == 0 and last[run + 1] == full:
+                    run += 1
+            if self.chunk_size and sent_any:
+                self._yield_bus()
+            sent_any = True
+            self._write_region(page, run, start, end)
+            for sent in range(page, run + 1):
+                first[sent] = 0xFF
+                last[sent] = 0
+            page = run + 1
+        return True
+
+    def _show_by_priority(self, deadline: Optional[float], priorities: Sequence[tuple]) -> bool:
+        """Send dirty pages highest priority first, while time allows"""
+        first = self._dirty_first
+        last = self._dirty_last
+        ranks = [0] * self.pages
+        for y, height, priority in priorities:
+            for page in range(max(y, 0) >> 3, min((y + height - 1) >> 3, self.pages - 1) + 1):
+                ranks[page] = max(ranks[page], priority)
+        pending = [page for page in range(self.pages) if first[page] <= last[page]]
+        pending.sort(key=lambda page: -ranks[page])
+        for count, page in enumerate(pending):
+            now = time.monotonic()
+            # always make progress, then only start pages expected to finish in time
+            if count and deadline is not None and now + self._page_time > deadline:
+                return False
+            self._write_region(page, page, first[page], last[page])
+            first[page] = 0xFF
+            last[page] = 0
+            self._page_time = (self._page_time + time.monotonic() - now) / 2
+        return True
 
 
 class SSD1306_I2C(_SSD1306):
@@ -229,62 +962,210 @@ class SSD1306_I2C(_SSD1306):
     :param addr: the 8-bit bus address of the device,
     :param external_vcc: whether external high-voltage source is connected.
     :param reset: if needed, DigitalInOut designating reset pin
+    :param retries: how many times a failed bus transaction is retried before the
+        `OSError` is raised. Failed frame data is resent from its address window.
+    :param transport: use this `Transport` instead of an `I2CDevice` on ``i2c``,
+        for example an `adafruit_ssd1306_linux.LinuxI2CTransport`. ``i2c`` may
+        then be None.
+    :param framebuffer: set to False to keep only one page (``width`` bytes) of
+        pixels instead of the whole screen, and draw through a `DisplayList`.
+    :param buffer: a writable buffer to use instead of allocating one, such as
+        `adafruit_ssd1306_linux.SharedFrameBuffer.buffer`. Its first byte holds
+        the I2C control byte and the pixels follow. The driver never writes to
+        the pixels while sending them, so other processes may draw meanwhile.
+    :param chunk_size: if not 0, send frame data in transfers of at most this many
+        bytes, releasing the bus in between so that other devices sharing it are
+        not held up for a whole frame (about 23ms at 400kHz).
+    :param yield_hook: called between chunks while the bus is free, e.g. to let a
+        higher priority transaction run. By default other threads get a chance to
+        run with ``time.sleep(0)``.
     """
 
     def __init__(
         self,
         width: int,
         height: int,
-        i2c: busio.I2C,
+        i2c: Optional[busio.I2C],
         *,
         addr: int = 0x3C,
         external_vcc: bool = False,
         reset: Optional[digitalio.DigitalInOut] = None,
         page_addressing: bool = False,
+        retries: int = 0,
+        transport: Optional["Transport"] = None,
+        framebuffer: bool = True,
+        buffer: Optional[memoryview] = None,
+        chunk_size: int = 0,
+        yield_hook: Optional[Callable[[], None]] = None,
     ):
-        self.i2c_device = i2c_device.I2CDevice(i2c, addr)
+        if transport is None:
+            transport = i2c_device.I2CDevice(i2c, addr)
+        self.i2c_device = transport
+        # transports that gather buffers get the control byte and data, and the
+        # window in front of them, in one transfer without copies
+        self._vectored = getattr(transport, "vectored", False)
+        # and those that chain messages get the window and the data as two
+        # messages of one transfer
+        self._chained = getattr(transport, "chained", False)
         self.addr = addr
         self.page_addressing = page_addressing
         self.temp = bytearray(2)
+        # Co=0, D/C#=0 followed by up to 16 command bytes
+        self._cmdbuf = bytearray(17)
+        # an address window of up to 6 commands, each after Co=1, D/C#=0, and
+        # then Co=0, D/C#=1 for the data that follows
+        self._pairbuf = bytearray(13)
         # Add an extra byte to the data buffer to hold an I2C data/command byte
         # to use hardware-compatible I2C transactions.  A memoryview of the
         # buffer is used to mask this byte from the framebuffer operations
         # (without a major memory hit as memoryview doesn't copy to a separate
         # buffer).
-        self.buffer = bytearray(((height // 8) * width) + 1)
+        # a buffer passed in may be shared with other code, so its pixels are
+        # copied behind the control byte rather than borrowing the byte in front
+        self._stage = None if buffer is None else bytearray(width + 1)
+        if buffer is None:
+            buffer = bytearray(((height // 8 if framebuffer else 1) * width) + 1)
+        self.buffer = buffer
         self.buffer[0] = 0x40  # Set first byte of data buffer to Co=0, D/C=1
+        self._cmdview = memoryview(self._cmdbuf)
+        self._pairview = memoryview(self._pairbuf)
+        self._bufview = memoryview(self.buffer)
         super().__init__(
-            memoryview(self.buffer)[1:],
+            self._bufview[1:],
             width,
             height,
             external_vcc=external_vcc,
             reset=reset,
             page_addressing=self.page_addressing,
+            retries=retries,
+            chunk_size=chunk_size,
+            yield_hook=yield_hook,
         )
 
     def write_cmd(self, cmd: int) -> None:
         """Send a command to the I2C device"""
-        self.temp[0] = 0x80  # Co=1, D/C#=0
-        self.temp[1] = cmd
-        with self.i2c_device:
-            self.i2c_device.write(self.temp)
+        self._lock.acquire()
+        try:
+            self.temp[0] = cmd
+            self._send_commands(self.temp, 1)
+        finally:
+            self._lock.release()
 
     def write_framebuf(self) -> None:
         """Blast out the frame buffer using a single I2C transaction to support
         hardware I2C interfaces."""
         if self.page_addressing:
             for page in range(self.pages):
-                self.write_cmd(0xB0 + page)
-                self.write_cmd(self.page_column_start[0])
-                self.write_cmd(self.page_column_start[1])
-                self.pagebuffer[1:] = self.buffer[
-                    1 + self.width * page : 1 + self.width * (page + 1)
-                ]
-                with self.i2c_device:
-                    self.i2c_device.write(self.pagebuffer)
+                self._write_region(page, page, 0, self.width - 1)
         else:
+            self._send_data(0, len(self.buffer) - 1)
+
+    def _write(self, buf: bytearray, start: int, end: int) -> None:
+        with self.i2c_device:
+            if not self._tracer:
+                self.i2c_device.write(buf, start=start, end=end)
+                return
+            began = time.monotonic()
+            self.i2c_device.write(buf, start=start, end=end)
+            # the control byte says whether commands or data follow
+            kind = "d" if buf[start] & 0x40 else "c"
+            self._tracer.record(kind, memoryview(buf)[start + 1 : end], began)
+
+    def _write_commands(self, cmds: bytes, end: int) -> None:
+        cmdbuf = self._cmdbuf
+        for start in range(0, end, 16):
+            count = min(16, end - start)
+            # copied byte by byte, as a slice of cmds would be a new object
+            for index in range(count):
+                cmdbuf[1 + index] = cmds[start + index]
+            self._write(cmdbuf, 0, 1 + count)
+
+    def _write_data(self, start: int, end: int) -> None:
+        if not start:
+            # buffer[0] is kept for the control byte
+            self._write(self.buffer, 0, end + 1)
+            return
+        if self._vectored:
             with self.i2c_device:
-                self.i2c_device.write(self.buffer)
+                began = time.monotonic()
+                self.i2c_device.writev(_I2C_DATA, self._bufview[start + 1 : end + 1])
+                if self._tracer:
+                    self._tracer.record("d", self._bufview[start + 1 : end + 1], began)
+            return
+        stage = self._stage
+        if stage is not None:
+            # copied byte by byte, as slices would be new objects
+            stage[0] = 0x40
+            buffer = self.buffer
+            size = len(stage) - 1
+            for first in range(start, end, size):
+                count = min(size, end - first)
+                for index in range(count):
+                    stage[1 + index] = buffer[first + 1 + index]
+                self._write(stage, 0, 1 + count)
+            return
+        # framebuffer byte i lives at buffer[i + 1], so buffer[start] can briefly
+        # hold the Co=0, D/C=1 control byte in front of the data without a copy
+        buffer = self.buffer
+        saved = buffer[start]
+        buffer[start] = 0x40
+        try:
+            self._write(buffer, start, end + 1)
+        finally:
+            buffer[start] = saved
+
+    def _write_buffer(self, buf: bytearray, end: int) -> None:
+        buf[0] = 0x40
+        self._write(buf, 0, end)
+
+    def _write_window(self, window: bytearray, count: int, start: int, end: int) -> None:
+        if self._vectored:
+            self._write_gathered(window, count, start, end)
+        elif self._chained and (self._stage is None or end - start < len(self._stage)):
+            self._write_chained(window, count, start, end)
+        else:
+            super()._write_window(window, count, start, end)
+
+    def _write_chained(self, window: bytearray, count: int, start: int, end: int) -> None:
+        """Send the window and the data as two messages of one transfer"""
+        cmdbuf = self._cmdbuf
+        for index in range(count):
+            cmdbuf[1 + index] = window[index]
+        if self._stage is None:
+            # borrow the byte in front of the data for the control byte, as in
+            # _write_data
+            buffer = self.buffer
+            data = self._bufview[start : end + 1]
+        else:
+            buffer = self._stage
+            buffer[1 : 1 + end - start] = self._bufview[start + 1 : end + 1]
+            data = memoryview(buffer)[: 1 + end - start]
+            start = 0
+        saved = buffer[start]
+        buffer[start] = 0x40
+        try:
+            with self.i2c_device:
+                began = time.monotonic()
+                self.i2c_device.write_messages(self._cmdview[: 1 + count], data)
+                if self._tracer:
+                    self._tracer.record("cd", window[:count], began, data[1:])
+        finally:
+            buffer[start] = saved
+
+    def _write_gathered(self, window: bytearray, count: int, start: int, end: int) -> None:
+        """Send the window, the control byte and the data in one writev"""
+        pairbuf = self._pairbuf
+        for index in range(count):
+            pairbuf[2 * index] = 0x80
+            pairbuf[2 * index + 1] = window[index]
+        pairbuf[2 * count] = 0x40
+        with self.i2c_device:
+            began = time.monotonic()
+            self.i2c_device.writev(
+                self._pairview[: 2 * count + 1], self._bufview[start + 1 : end + 1]
+            )
+            if self._tracer:
+                self._tracer.record("cd", window[:count], began, self._bufview[start + 1 : end + 1])
 
 
 class SSD1306_SPI(_SSD1306):
@@ -297,6 +1178,15 @@ class SSD1306_SPI(_SSD1306):
     :param dc: the data/command pin to use (often labeled "D/C"),
     :param reset: the reset pin to use,
     :param cs: the chip-select pin to use (sometimes labeled "SS").
+    :param retries: how many times a failed bus transaction is retried before the
+        `OSError` is raised. Failed frame data is resent from its address window.
+    :param transport: use this `Transport` instead of an `SPIDevice` on ``spi``,
+        for example an `adafruit_ssd1306_linux.LinuxSPITransport`. ``spi`` and
+        ``cs`` may then be None.
+    :param framebuffer: set to False to keep only one page (``width`` bytes) of
+        pixels instead of the whole screen, and draw through a `DisplayList`.
+    :param buffer: a writable buffer of pixels to use instead of allocating one,
+        such as `adafruit_ssd1306_linux.SharedFrameBuffer.pixels`.
     """
 
     # Disable should be reconsidered when refactor can be tested.
@@ -304,16 +1194,20 @@ class SSD1306_SPI(_SSD1306):
         self,
         width: int,
         height: int,
-        spi: busio.SPI,
+        spi: Optional[busio.SPI],
         dc: digitalio.DigitalInOut,
         reset: Optional[digitalio.DigitalInOut],
-        cs: digitalio.DigitalInOut,
+        cs: Optional[digitalio.DigitalInOut],
         *,
         external_vcc: bool = False,
         baudrate: int = 8000000,
         polarity: int = 0,
         phase: int = 0,
         page_addressing: bool = False,
+        retries: int = 0,
+        transport: Optional["Transport"] = None,
+        framebuffer: bool = True,
+        buffer: Optional[memoryview] = None,
     ):
         self.page_addressing = page_addressing
         if self.page_addressing:
@@ -321,11 +1215,16 @@ class SSD1306_SPI(_SSD1306):
 
         self.rate = 10 * 1024 * 1024
         dc.switch_to_output(value=0)
-        self.spi_device = spi_device.SPIDevice(
-            spi, cs, baudrate=baudrate, polarity=polarity, phase=phase
-        )
+        if transport is None:
+            transport = spi_device.SPIDevice(
+                spi, cs, baudrate=baudrate, polarity=polarity, phase=phase
+            )
+        self.spi_device = transport
         self.dc_pin = dc
-        self.buffer = bytearray((height // 8) * width)
+        self._cmd = bytearray(1)
+        if buffer is None:
+            buffer = bytearray((height // 8 if framebuffer else 1) * width)
+        self.buffer = buffer
         super().__init__(
             memoryview(self.buffer),
             width,
@@ -333,16 +1232,1491 @@ class SSD1306_SPI(_SSD1306):
             external_vcc=external_vcc,
             reset=reset,
             page_addressing=self.page_addressing,
+            retries=retries,
         )
 
     def write_cmd(self, cmd: int) -> None:
         """Send a command to the SPI device"""
-        self.dc_pin.value = 0
-        with self.spi_device as spi:
-            spi.write(bytearray([cmd]))
+        self._lock.acquire()
+        try:
+            self._cmd[0] = cmd
+            self._send_commands(self._cmd, 1)
+        finally:
+            self._lock.release()
 
     def write_framebuf(self) -> None:
         """write to the frame buffer via SPI"""
-        self.dc_pin.value = 1
+        self._send_data(0, len(self.buffer))
+
+    def _write_commands(self, cmds: bytes, end: int) -> None:
+        self._write(0, cmds, 0, end)
+
+    def _write_data(self, start: int, end: int) -> None:
+        self._write(1, self.buffer, start, end)
+
+    def _write_buffer(self, buf: bytearray, end: int) -> None:
+        self._write(1, buf, 1, end)
+
+    def _write(self, data: int, buf: bytearray, start: int, end: int) -> None:
+        """Send buf[start:end] as commands or, if data is 1, as display data"""
+        self.dc_pin.value = data
         with self.spi_device as spi:
-            spi.write(self.buffer)
+            if not self._tracer:
+                spi.write(buf, start=start, end=end)
+                return
+            began = time.monotonic()
+            spi.write(buf, start=start, end=end)
+            self._tracer.record("d" if data else "c", memoryview(buf)[start:end], began)
+
+
+class ColumnStream:
+    """
+    Streams a strip chart into a band of the display one column at a time, using
+    vertical addressing so that each new column costs a short window command and
+    one byte per page instead of a frame.
+
+    By default new columns sweep across the band, wrapping around like an
+    oscilloscope in roll mode. With ``scroll=True`` the band is shifted by the
+    controller's one-column content scroll command (``0x2C``/``0x2D``, found on
+    later SSD1306 revisions and the SSD1309) and every new column is written at
+    the right edge; this needs the band to be the full width of the display.
+    The framebuffer is kept in step either way, so `show` remains consistent.
+
+    :param display: a display using horizontal addressing
+    :param x: the first column of the band
+    :param y: the first row of the band, a multiple of 8
+    :param width: the width of the band, the rest of the display by default
+    :param height: the height of the band, a multiple of 8, the rest of the
+        display by default
+    :param scroll: use hardware scrolling instead of sweeping
+    """
+
+    def __init__(
+        self,
+        display: _SSD1306,
+        *,
+        x: int = 0,
+        y: int = 0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        scroll: bool = False,
+    ):
+        if display.page_addressing:
+            raise ValueError("Column streaming needs horizontal addressing")
+        if width is None:
+            width = display.width - x
+        if height is None:
+            height = display.height - y
+        if y % 8 or height % 8:
+            raise ValueError("The band must start and end on a page boundary")
+        if scroll and width != display.width:
+            raise ValueError("Hardware scrolling needs the full display width")
+        self.display = display
+        self.x = x
+        self.width = width
+        self.first_page = y // 8
+        self.last_page = (y + height) // 8 - 1
+        self.scroll = scroll
+        self.pointer = 0
+        self._column = bytearray(height // 8 + 1)
+        self._window = bytearray(
+            (SET_COL_ADDR, 0, 0, SET_PAGE_ADDR, self.first_page, self.last_page)
+        )
+        self._scroll = bytearray((0x2D, 0x00, self.first_page, 0x01, self.last_page, 0x00, 0xFF))
+
+    def push(self, column=None) -> None:
+        """Add a column: one MONO_VLSB byte per page of the band, top first. Without
+        an argument the column prepared by `plot` is sent."""
+        display = self.display
+        buf = display._fb
+        width = display.width
+        staged = self._column
+        if column is not None:
+            if len(column) != len(staged) - 1:
+                raise ValueError("A column needs one byte per page of the band")
+            staged[1:] = column
+        if self.scroll:
+            # 0x2C moves the content towards higher segments, which are lower
+            # column addresses when the columns are remapped
+            self._scroll[0] = 0x2C if display._remap else 0x2D
+            display.write_cmds(self._scroll)
+            target = self.x + self.width - 1
+            for page in range(self.first_page, self.last_page + 1):
+                row = page * width + self.x
+                buf[row : row + self.width - 1] = buf[row + 1 : row + self.width]
+        else:
+            target = self.x + self.pointer
+            self.pointer = (self.pointer + 1) % self.width
+        for index, page in enumerate(range(self.first_page, self.last_page + 1), 1):
+            buf[page * width + target] = staged[index]
+        display._set_memory_mode(0x01)
+        self._window[1] = self._window[2] = display._col_offset + target
+        display._send_commands(self._window, 6)
+        display._send_buffer(staged, len(staged))
+
+    def plot(self, value: float, minimum: float = 0, maximum: float = 1, *, bar: bool = False):
+        """Push a column showing value as a point, or a bar from the bottom, scaled
+        so that minimum is the bottom row of the band and maximum the top"""
+        staged = self._column
+        rows = (len(staged) - 1) * 8
+        scaled = (value - minimum) * (rows - 1) / (maximum - minimum)
+        level = rows - 1 - min(max(int(scaled + 0.5), 0), rows - 1)
+        for index in range(1, len(staged)):
+            top = (index - 1) * 8
+            if bar:
+                staged[index] = (0xFF << max(level - top, 0)) & 0xFF if level < top + 8 else 0
+            else:
+                staged[index] = 1 << (level - top) if top <= level < top + 8 else 0
+        self.push()
+
+
+class Effects:
+    """
+    A timeline of display effects made only of register changes, so they cost a
+    few command bytes per step and no frame data: contrast ramps, invert
+    blinking, display on/off pulsing, and the controller's own fade out/blink
+    (``0x23``) and zoom in (``0xD6``) modes, where the panel supports them.
+
+    Each effect method adds steps starting where the timeline ended so far, or at
+    ``at`` seconds from the start, and returns the timeline so calls can be
+    chained. Steps that fall due together are sent in a single transaction.
+    Play the timeline with `run`, `run_async` (in an asyncio task),
+    `start_thread`, or by calling `step` from an existing loop.
+
+    :param display: the display to apply the effects to
+    """
+
+    def __init__(self, display: _SSD1306):
+        self.display = display
+        # (seconds from the start, command bytes), in order of time
+        self.events = []
+        self.length = 0.0
+        self._start = None
+        self._next = 0
+
+    def _add(self, at: Optional[float], offset: float, *cmds: int) -> None:
+        when = (self.length if at is None else at) + offset
+        index = len(self.events)
+        while index and self.events[index - 1][0] > when:
+            index -= 1
+        self.events.insert(index, (when, bytes(cmds)))
+
+    def _end(self, at: Optional[float], duration: float) -> "Effects":
+        self.length = max(self.length, (self.length if at is None else at) + duration)
+        return self
+
+    def contrast(
+        self, start: int, end: int, duration: float, *, steps: int = 16, at: Optional[float] = None
+    ) -> "Effects":
+        """Ramp the contrast from start to end (0-255) over duration seconds"""
+        for index in range(steps + 1):
+            level = start + (end - start) * index // steps
+            self._add(at, duration * index / steps, SET_CONTRAST, level)
+        return self._end(at, duration)
+
+    def blink(self, count: int, period: float, *, at: Optional[float] = None) -> "Effects":
+        """Invert the display count times, for half of each period"""
+        for index in range(count):
+            self._add(at, index * period, SET_NORM_INV | 1)
+            self._add(at, index * period + period / 2, SET_NORM_INV)
+        return self._end(at, count * period)
+
+    def pulse(self, count: int, period: float, *, at: Optional[float] = None) -> "Effects":
+        """Turn the display off count times, for half of each period"""
+        for index in range(count):
+            self._add(at, index * period, SET_DISP)
+            self._add(at, index * period + period / 2, SET_DISP | 1)
+        return self._end(at, count * period)
+
+    def hardware_fade(
+        self, frames: int = 8, *, blink: bool = False, at: Optional[float] = None
+    ) -> "Effects":
+        """Start the controller's fade out (or, with blink, continuous blinking),
+        dimming one step every frames (8 to 128) display frames. `hardware_stop`
+        ends it."""
+        mode = 0x30 if blink else 0x20
+        self._add(at, 0, 0x23, mode | (min(max(frames, 8), 128) // 8 - 1))
+        return self._end(at, 0)
+
+    def hardware_stop(self, *, at: Optional[float] = None) -> "Effects":
+        """End a controller fade out or blink"""
+        self._add(at, 0, 0x23, 0x00)
+        return self._end(at, 0)
+
+    def zoom(self, enable: bool = True, *, at: Optional[float] = None) -> "Effects":
+        """Turn the controller's zoom in (each row doubled) on or off. It needs the
+        alternative COM pin configuration."""
+        self._add(at, 0, 0xD6, 0x01 if enable else 0x00)
+        return self._end(at, 0)
+
+    def wait(self, duration: float) -> "Effects":
+        """Leave a gap before the next effect"""
+        return self._end(None, duration)
+
+    def step(self, now: Optional[float] = None) -> Optional[float]:
+        """Send the steps that are due, all in one transaction. Returns the seconds
+        until the next step, or None when the timeline is finished. The display
+        keeps track of the contrast, inversion and power the steps set, so that
+        a power budget goes on applying to them.
+
+        :param now: the `time.monotonic` time, which starts the timeline on the
+            first call
+        """
+        if now is None:
+            now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        elapsed = now - self._start
+        events = self.events
+        first = self._next
+        while self._next < len(events) and events[self._next][0] <= elapsed:
+            self._next += 1
+        if self._next > first:
+            display = self.display
+            display._lock.acquire()
+            try:
+                display.write_cmds(b"".join(cmds for _, cmds in events[first : self._next]))
+                for _, cmds in events[first : self._next]:
+                    if cmds[0] == SET_CONTRAST:
+                        display._contrast = display._applied_contrast = cmds[1]
+                    elif cmds[0] & 0xFE == SET_NORM_INV:
+                        display._inverted = bool(cmds[0] & 1)
+                    elif cmds[0] & 0xFE == SET_DISP:
+                        display._power = bool(cmds[0] & 1)
+                if display._lit is not None:
+                    display._apply_budget()
+            finally:
+                display._lock.release()
+        if self._next < len(events):
+            return events[self._next][0] - elapsed
+        return None
+
+    def rewind(self) -> None:
+        """Start from the beginning on the next `step`"""
+        self._start = None
+        self._next = 0
+
+    def run(self) -> None:
+        """Play the whole timeline, sleeping between steps"""
+        delay = self.step()
+        while delay is not None:
+            time.sleep(delay)
+            delay = self.step()
+
+    async def run_async(self) -> None:
+        """Play the whole timeline without blocking other asyncio tasks"""
+        import asyncio  # noqa: PLC0415
+
+        delay = self.step()
+        while delay is not None:
+            await asyncio.sleep(delay)
+            delay = self.step()
+
+    def start_thread(self):
+        """Play the timeline on a new daemon thread, which is returned. From then
+        on the display holds a lock around each bus transaction, so `show` and
+        the other methods that send may still be called from other threads."""
+        import threading  # noqa: PLC0415
+
+        if self.display._lock is _NO_LOCK:
+            self.display._lock = threading.RLock()
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+
+class Layer(framebuf.FrameBuffer):
+    """
+    An offscreen MONO_VLSB layer, created with `_SSD1306.add_layer`. Draw on it with
+    the usual framebuffer methods and call `mark_dirty` for what changed; on the
+    next update the display recomposites only those spans.
+
+    :param width: the width of the layer in pixels
+    :param height: the height of the layer in pixels
+    :param op: how the layer combines with those below it
+    """
+
+    def __init__(self, width: int, height: int, op: int = LAYER_OR):
+        self.buffer = bytearray(width * (height // 8))
+        super().__init__(self.buffer, width, height, _FRAMEBUF_FORMAT)
+        self.width = width
+        self.height = height
+        self.op = op
+        self._visible = True
+        self._dirty_first = bytearray(b"\xff" * (height // 8))
+        self._dirty_last = bytearray(height // 8)
+
+    @property
+    def visible(self) -> bool:
+        """Whether the layer takes part in compositing"""
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible: bool) -> None:
+        if visible != self._visible:
+            self._visible = visible
+            self.mark_dirty(0, 0, self.width, self.height)
+
+    def mark_dirty(self, x: int, y: int, width: int, height: int) -> None:
+        """Mark a rectangle of the layer as changed"""
+        _mark_spans(self._dirty_first, self._dirty_last, self, x, y, width, height)
+
+    def save_region(self, x: int, y: int, width: int, height: int) -> tuple:
+        """Save the layer under a rectangle, e.g. before drawing a popup over it.
+        The saved bytes are whole pages high."""
+        return _save_region(self.buffer, self.width, self.height, x, y, width, height)
+
+    def restore_region(self, saved: tuple) -> None:
+        """Put back a region saved with `save_region`, so closing a popup costs a
+        copy and a recomposite of the pages under it"""
+        self.mark_dirty(*_restore_region(self.buffer, self.width, saved))
+
+
+class _Bits:
+    """Unpacked pixels of a display, packed back on exit, see `_SSD1306.bits`"""
+
+    def __init__(self, display: _SSD1306):
+        self._display = display
+        self._packed = None
+        self._original = None
+        self._pixels = None
+
+    def __enter__(self):
+        import numpy as np  # noqa: PLC0415
+
+        self._packed = self._display.array
+        self._original = np.unpackbits(self._packed, axis=0, bitorder="little").view(bool)
+        self._pixels = self._original.copy()
+        return self._pixels
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        import numpy as np  # noqa: PLC0415
+
+        pixels = self._pixels
+        changed = pixels != self._original
+        pages = np.flatnonzero(changed.reshape(len(self._packed), 8, -1).any(axis=(1, 2)))
+        for page in pages:
+            rows = slice(page * 8, page * 8 + 8)
+            self._packed[page] = np.packbits(pixels[rows], axis=0, bitorder="little")
+            columns = np.flatnonzero(changed[rows].any(axis=0))
+            first = int(columns[0])
+            self._display.mark_dirty(first, int(page) * 8, int(columns[-1]) - first + 1, 8)
+        self._packed = self._original = self._pixels = None
+
+
+def _bayer8() -> bytes:
+    """The 8x8 Bayer matrix scaled to gray level thresholds 2..254"""
+    matrix = [0]
+    size = 1
+    while size < 8:
+        matrix = [
+            4 * matrix[(y % size) * size + x % size] + (0, 2, 3, 1)[(y // size) * 2 + x // size]
+            for y in range(2 * size)
+            for x in range(2 * size)
+        ]
+        size *= 2
+    return bytes(4 * value + 2 for value in matrix)
+
+
+def _gray_to_vlsb(gray, width: int, height: int, dither: int, threshold: int) -> bytes:
+    """Dither width * height gray levels (row by row) to packed MONO_VLSB bytes"""
+    try:
+        import numpy as np  # noqa: PLC0415
+    except ImportError:
+        np = None
+    if np is not None:
+        gray = np.frombuffer(gray, np.uint8) if not hasattr(gray, "shape") else gray
+        gray = np.asarray(gray, np.uint8).reshape(height, width)
+        if dither == DITHER_THRESHOLD:
+            bits = gray >= threshold
+        elif dither == DITHER_BAYER:
+            matrix = np.frombuffer(_bayer8(), np.uint8).reshape(8, 8)
+            bits = gray > np.tile(matrix, (height // 8, (width + 7) // 8))[:, :width]
+        else:
+            bits = np.frombuffer(_diffuse(gray.tobytes(), width, height), np.uint8)
+            bits = bits.reshape(height, width)
+        return np.packbits(bits.reshape(height // 8, 8, width), axis=1, bitorder="little").tobytes()
+    if dither == DITHER_DIFFUSION:
+        bits = _diffuse(gray, width, height)
+    elif dither == DITHER_BAYER:
+        matrix = _bayer8()
+        bits = bytes(
+            gray[y * width + x] > matrix[(y & 7) * 8 + (x & 7)]
+            for y in range(height)
+            for x in range(width)
+        )
+    else:
+        bits = bytes(value >= threshold for value in gray)
+    packed = bytearray(width * (height // 8))
+    for y in range(height):
+        bit = 1 << (y & 7)
+        row = (y >> 3) * width
+        for x in range(width):
+            if bits[y * width + x]:
+                packed[row + x] |= bit
+    return packed
+
+
+def _diffuse(gray, width: int, height: int) -> bytes:
+    """Floyd-Steinberg dither gray levels to one 0 or 1 per pixel"""
+    try:
+        from PIL import Image  # noqa: PLC0415
+
+        image = Image.frombytes("L", (width, height), bytes(gray)).convert("1")
+        return image.point(lambda value: value and 1, "L").tobytes()
+    except ImportError:
+        pass
+    bits = bytearray(width * height)
+    errors = [0] * (width + 2)
+    for y in range(height):
+        below = [0] * (width + 2)
+        carry = 0
+        for x in range(width):
+            value = gray[y * width + x] + errors[x + 1] + carry
+            pixel = value >= 128
+            bits[y * width + x] = pixel
+            error = value - 255 * pixel
+            carry = error * 7 // 16
+            below[x] += error * 3 // 16
+            below[x + 1] += error * 5 // 16
+            below[x + 2] += error // 16
+        errors = below
+    return bits
+
+
+def _image1_to_vlsb(image, buf) -> None:
+    """Copy a PIL mode 1 image into the MONO_VLSB buffer buf in bulk"""
+    width, height = image.size
+    pages = height // 8
+    # transposed and packed least significant bit first, each image column
+    # becomes a run of MONO_VLSB bytes, one per page
+    columns = image.transpose(5).tobytes("raw", "1;R")  # Image.Transpose.TRANSPOSE
+    for page in range(pages):
+        buf[page * width : (page + 1) * width] = columns[page::pages]
+
+
+def _count_lit(buf, start: int, count: int) -> int:
+    """The number of set bits in buf[start:start + count]"""
+    # a table lookup per byte, as bytes.translate is missing on microcontrollers
+    lit = 0
+    for index in range(start, start + count):
+        lit += _POPCOUNT[buf[index]]
+    return lit
+
+
+_POPCOUNT = bytes(bin(value).count("1") for value in range(256))
+
+
+def _refresh_rate(oscillator_hz: int, clock_div: int, precharge: int, mux: int) -> float:
+    """Estimate the panel refresh rate in Hz from the timing registers. The
+    oscillator frequency is taken to change about 5.5% per setting step."""
+    fosc = oscillator_hz * (1 + 0.055 * ((clock_div >> 4) - 8))
+    clocks = (precharge & 0x0F) + (precharge >> 4) + 50
+    return fosc / (((clock_div & 0x0F) + 1) * clocks * mux)
+
+
+def _mark_spans(first, last, surface, x: int, y: int, width: int, height: int) -> None:
+    """Widen the per page dirty column spans first/last to cover a rectangle"""
+    x_0 = max(x, 0)
+    x_1 = min(x + width, surface.width) - 1
+    y_0 = max(y, 0)
+    y_1 = min(y + height, surface.height) - 1
+    if x_0 > x_1 or y_0 > y_1:
+        return
+    for page in range(y_0 >> 3, (y_1 >> 3) + 1):
+        first[page] = min(first[page], x_0)
+        last[page] = max(last[page], x_1)
+
+
+def _scroll_page(
+    buf,
+    width: int,
+    pages: int,
+    page: int,
+    delta_x: int,
+    delta_y: int,
+    x_0: int,
+    count: int,
+    keep: int,
+) -> None:
+    """Fill columns x_0..x_0+count-1 of a page of a MONO_VLSB buffer with the rows
+    delta_y above and the columns delta_x to the left, except for the rows set
+    in keep. Each byte combines the bits of two source pages; pages outside the
+    buffer read as 0."""
+    source = page * 8 - delta_y
+    bits = source & 7
+    upper = source >> 3
+    lower = upper + 1
+    upper = upper * width - delta_x if 0 <= upper < pages else None
+    lower = lower * width - delta_x if 0 <= lower < pages else None
+    row = page * width
+    # when the source overlaps this page, read each column before it is overwritten
+    columns = range(x_0 + count - 1, x_0 - 1, -1) if delta_x > 0 else range(x_0, x_0 + count)
+    for column in columns:
+        byte = 0
+        if upper is not None:
+            byte = buf[upper + column] >> bits
+        if lower is not None:
+            byte |= buf[lower + column] << (8 - bits) & 0xFF
+        buf[row + column] = (buf[row + column] & keep) | (byte & ~keep)
+
+
+def _save_region(buf, buf_width: int, buf_height: int, x, y, width, height) -> tuple:
+    """Copy the whole pages of a MONO_VLSB buffer under a rectangle"""
+    x_0 = max(x, 0)
+    x_1 = max(min(x + width, buf_width), x_0)
+    first = max(y, 0) >> 3
+    last = (min(y + height, buf_height) - 1) >> 3
+    rows = [
+        bytes(buf[page * buf_width + x_0 : page * buf_width + x_1])
+        for page in range(first, last + 1)
+    ]
+    return (x_0, first, x_1 - x_0, rows)
+
+
+def _restore_region(buf, buf_width: int, saved: tuple) -> tuple:
+    """Copy a saved region back, returning the rectangle it covers"""
+    x, first, width, rows = saved
+    for page, row in enumerate(rows, first):
+        buf[page * buf_width + x : page * buf_width + x + width] = row
+    return (x, first * 8, width, len(rows) * 8)
+
+
+class RotatedFrameBuffer(framebuf.FrameBuffer):
+    """
+    A portrait drawing surface for a display mounted at 90 or 270 degrees. Draw on
+    it in logical coordinates (``display.height`` wide, ``display.width`` tall)
+    with the usual framebuffer methods; `show` transposes the changed part into the
+    display's framebuffer 8x8 pixels at a time and updates the display.
+
+    :param display: the display to draw on
+    :param rotation: 90 or 270 degrees clockwise
+    """
+
+    def __init__(self, display: _SSD1306, rotation: int = 90):
+        if rotation not in {90, 270}:
+            raise ValueError("rotation must be 90 or 270")
+        self.display = display
+        self.rotation_degrees = rotation
+        self.buffer = bytearray(display.height * display.width // 8)
+        super().__init__(self.buffer, display.height, display.width, _FRAMEBUF_FORMAT)
+        self.width = display.height
+        self.height = display.width
+        self._dirty = None
+
+    def mark_dirty(self, x: int, y: int, width: int, height: int) -> None:
+        """Mark a rectangle as changed. If nothing is marked before `show`, the
+        whole surface is transposed."""
+        x_1 = x + width
+        y_1 = y + height
+        if self._dirty:
+            x = min(x, self._dirty[0])
+            y = min(y, self._dirty[1])
+            x_1 = max(x_1, self._dirty[2])
+            y_1 = max(y_1, self._dirty[3])
+        self._dirty = (x, y, x_1, y_1)
+
+    def show(self) -> None:
+        """Transpose the changed region into the display and update it"""
+        display = self.display
+        x_0, y_0, x_1, y_1 = self._dirty or (0, 0, self.width, self.height)
+        self._dirty = None
+        # round out to whole 8x8 blocks
+        x_0 = max(x_0, 0) >> 3
+        y_0 = max(y_0, 0) >> 3
+        x_1 = (min(x_1, self.width) + 7) >> 3
+        y_1 = (min(y_1, self.height) + 7) >> 3
+        if x_0 >= x_1 or y_0 >= y_1:
+            return
+        src = self.buffer
+        dst = display._fb
+        width = display.width
+        for page in range(y_0, y_1):
+            for block in range(x_0, x_1):
+                s = page * self.width + block * 8
+                if self.rotation_degrees == 90:
+                    # logical (x, y) is physical (width - 1 - y, x)
+                    d = block * width + width - 8 - page * 8
+                    _transpose8(src, s + 7, -1, dst, d, 1)
+                else:
+                    # logical (x, y) is physical (y, height - 1 - x)
+                    d = (display.pages - 1 - block) * width + page * 8 + 7
+                    _transpose8(src, s, 1, dst, d, -1)
+        if self.rotation_degrees == 90:
+            display.mark_dirty(width - y_1 * 8, x_0 * 8, (y_1 - y_0) * 8, (x_1 - x_0) * 8)
+        else:
+            display.mark_dirty(y_0 * 8, display.height - x_1 * 8, (y_1 - y_0) * 8, (x_1 - x_0) * 8)
+        display.show(partial=True)
+
+
+class DisplayList:
+    """
+    A retained list of drawing operations, rasterized one 8-pixel-tall page at a
+    time and streamed to the display page by page. Combined with a display made
+    with ``framebuffer=False`` only ``width`` bytes of pixel memory are needed.
+    Only pages touched by items that were added, changed or removed since the last
+    `render` are redrawn and sent.
+
+    Each drawing method returns an item that can be passed to `update` and
+    `remove`. Items are drawn in the order they were added.
+
+    :param display: the display to render to
+    """
+
+    def __init__(self, display: _SSD1306):
+        self.display = display
+        self.items = []
+        self._dirty = bytearray(b"\x01" * display.pages)
+        width = display.width
+        self._pages = [
+            framebuf.FrameBuffer(
+                display._fb[page * width : (page + 1) * width], width, 8, _FRAMEBUF_FORMAT
+            )
+            for page in range(display._buffer_pages)
+        ]
+
+    def text(self, string: str, x: int, y: int, color: int = 1, *, size: int = 1) -> list:
+        """Add text with the built in font; MicroPython's framebuf only draws size 1"""
+        if size != 1 and _NATIVE_FRAMEBUF:
+            raise ValueError("MicroPython's framebuf only draws text at size 1")
+        lines = string.split("\n")
+        # generous enough for both the 5x8 and 8x8 framebuf fonts
+        bounds = (x, y, max(len(line) for line in lines) * 8 * size, len(lines) * 8 * size)
+        return self._add(_DL_TEXT, (string, x, y, color, size), bounds)
+
+    def rect(
+        self, x: int, y: int, width: int, height: int, color: int = 1, *, fill: bool = False
+    ) -> list:
+        """Add a rectangle outline, or a filled rectangle"""
+        return self._add(_DL_RECT, (x, y, width, height, color, fill), (x, y, width, height))
+
+    def line(self, x_0: int, y_0: int, x_1: int, y_1: int, color: int = 1) -> list:
+        """Add a line"""
+        bounds = (min(x_0, x_1), min(y_0, y_1), abs(x_1 - x_0) + 1, abs(y_1 - y_0) + 1)
+        return self._add(_DL_LINE, (x_0, y_0, x_1, y_1, color), bounds)
+
+    def bitmap(self, bitmap, x: int, y: int, width: int, height: int) -> list:
+        """Add a MONO_VLSB bitmap of the given size; its set pixels are drawn"""
+        return self._add(_DL_BITMAP, (bitmap, x, y, width, height), (x, y, width, height))
+
+    def update(self, item: list, *args, **kwargs) -> None:
+        """Replace the arguments of an item, e.g. ``update(label, "new text", 0, 8)``"""
+        self._touch(item)
+        # draw a replacement the usual way, then move its arguments into the item
+        replacement = getattr(self, _DL_METHODS[item[0]])(*args, **kwargs)
+        self.items.pop()
+        item[1] = replacement[1]
+        item[2] = replacement[2]
+
+    def remove(self, item: list) -> None:
+        """Remove an item"""
+        self._touch(item)
+        self.items.remove(item)
+
+    def clear(self) -> None:
+        """Remove all items"""
+        for item in self.items:
+            self._touch(item)
+        self.items = []
+
+    def render(self, *, full: bool = False) -> None:
+        """Redraw and send the pages that changed, or all pages if full is True"""
+        display = self.display
+        width = display.width
+        for page in range(display.pages):
+            if not (full or self._dirty[page]):
+                continue
+            index = page % display._buffer_pages
+            target = self._pages[index]
+            view = display._fb[index * width : (index + 1) * width]
+            target.fill(0)
+            top = page * 8
+            for kind, args, bounds in self.items:
+                if bounds[1] >= top + 8 or bounds[1] + bounds[3] <= top:
+                    continue
+                if kind == _DL_TEXT and args[4] == 1:
+                    target.text(args[0], args[1], args[2] - top, args[3])
+                elif kind == _DL_TEXT:
+                    target.text(args[0], args[1], args[2] - top, args[3], size=args[4])
+                elif kind == _DL_RECT:
+                    x, y, w, h, color, fill = args
+                    y -= top
+                    if fill:
+                        target.fill_rect(x, y, w, h, color)
+                    else:
+                        # edge by edge, as rect() would draw the clipped outline
+                        target.fill_rect(x, y, w, 1, color)
+                        target.fill_rect(x, y + h - 1, w, 1, color)
+                        target.fill_rect(x, y, 1, h, color)
+                        target.fill_rect(x + w - 1, y, 1, h, color)
+                elif kind == _DL_LINE:
+                    target.line(args[0], args[1] - top, args[2], args[3] - top, args[4])
+                else:
+                    _blit_vlsb(view, width, 8, args[0], args[3], args[4], args[1], args[2] - top)
+            display._write_region(page, page, 0, width - 1)
+            self._dirty[page] = 0
+
+    def _add(self, kind: int, args: tuple, bounds: tuple) -> list:
+        item = [kind, args, bounds]
+        self.items.append(item)
+        self._touch(item)
+        return item
+
+    def _touch(self, item: list) -> None:
+        """Mark the pages under an item for redrawing"""
+        top = max(item[2][1], 0) >> 3
+        bottom = min((item[2][1] + item[2][3] - 1) >> 3, len(self._dirty) - 1)
+        for page in range(top, bottom + 1):
+            self._dirty[page] = 1
+
+
+_DL_TEXT = const(0)
+_DL_RECT = const(1)
+_DL_LINE = const(2)
+_DL_BITMAP = const(3)
+_DL_METHODS = ("text", "rect", "line", "bitmap")
+
+
+class TextCache:
+    """
+    Draws text in PIL fonts, such as TrueType fonts, straight into a display's
+    framebuffer. Each (string, font) is rasterized once into a packed MONO_VLSB
+    strip, so a dashboard redrawing the same strings every frame skips both the
+    rasterizing and the image conversion. Strips are kept up to ``max_bytes``,
+    least recently used first out.
+
+    Text that changes often, like a clock or a reading, can be drawn with
+    ``glyphs=True`` instead: then every character is cached on its own and the
+    string is assembled from them (without kerning).
+
+    :param display: the display to draw on
+    :param max_bytes: the most pixel memory the cached strips may use
+    """
+
+    def __init__(self, display: _SSD1306, *, max_bytes: int = 16384):
+        self.display = display
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # (string, font): (pixels, offset, width, height, advance), least recently
+        # used first
+        self._strips = {}
+        self._fonts = {}
+
+    def text(
+        self,
+        string: str,
+        x: int,
+        y: int,
+        font,
+        size: Optional[int] = None,
+        *,
+        glyphs: bool = False,
+        opaque: bool = False,
+    ) -> int:
+        """Draw a single line of text with its top left corner at (x, y) and mark
+        it dirty. Returns the width the text advanced.
+
+        :param font: a PIL font, or the path of a TrueType font to load at ``size``
+        :param size: the size in pixels when ``font`` is a path
+        :param glyphs: cache and draw character by character
+        :param opaque: clear the pixels around the text, e.g. to replace a value
+        """
+        if isinstance(font, str):
+            key = (font, size)
+            if key not in self._fonts:
+                from PIL import ImageFont  # noqa: PLC0415
+
+                self._fonts[key] = ImageFont.truetype(font, size)
+            font = self._fonts[key]
+        display = self.display
+        start = x
+        for part in string if glyphs else (string,):
+            pixels, offset, width, height, advance = self._strip(part, font)
+            _blit_vlsb(
+                display._fb,
+                display.width,
+                display.height,
+                pixels,
+                width,
+                height,
+                x + offset,
+                y,
+                opaque,
+            )
+            display.mark_dirty(x + offset, y, width, height)
+            x += advance
+        return x - start
+
+    def clear(self) -> None:
+        """Forget all cached strips"""
+        self._strips = {}
+        self.size = 0
+
+    def _strip(self, string: str, font) -> tuple:
+        """The cached strip of a string, rasterized on a miss"""
+        key = (string, font)
+        strip = self._strips.pop(key, None)
+        if strip is None:
+            self.misses += 1
+            strip = _render_text(string, font)
+            self.size += len(strip[0])
+        else:
+            self.hits += 1
+        self._strips[key] = strip
+        while self.size > self.max_bytes and len(self._strips) > 1:
+            oldest = next(iter(self._strips))
+            self.size -= len(self._strips.pop(oldest)[0])
+        return strip
+
+
+def _render_text(string: str, font) -> tuple:
+    """Rasterize a line of text to (MONO_VLSB pixels, offset, width, height,
+    advance). The strip spans the advance and any ink outside it, such as a
+    negative left bearing, and starts offset columns from the text origin."""
+    from PIL import Image, ImageDraw  # noqa: PLC0415
+
+    left, _, right, bottom = font.getbbox(string)
+    if hasattr(font, "getmetrics"):
+        ascent, descent = font.getmetrics()
+        bottom = max(bottom, ascent + descent)
+    advance = int(font.getlength(string) + 0.5)
+    # the bounding box is only an estimate of the ink, so leave room around it
+    margin = 2 + bottom // 4
+    origin = margin - min(left, 0)
+    image = Image.new("1", (origin + max(right, advance) + margin, bottom + margin))
+    ImageDraw.Draw(image).text((origin, 0), string, font=font, fill=1)
+    ink = image.getbbox() or (origin, 0, origin, 0)
+    first = min(origin, ink[0])
+    width = max(origin + advance, ink[2]) - first or 1
+    height = max(bottom, ink[3], 1)
+    image = image.crop((first, 0, first + width, (height + 7) & ~7))
+    pixels = bytearray(width * image.size[1] // 8)
+    _image1_to_vlsb(image, pixels)
+    return bytes(pixels), first - origin, width, height, advance
+
+
+class Widget:
+    """
+    Base class of the retained widgets. A widget owns a rectangle of the display
+    and remembers the value it last drew: setting `value` redraws it only if the
+    value changed, and marks only what was redrawn as dirty, so that
+    ``display.show(partial=True)`` sends a few bytes instead of the frame.
+
+    Subclasses implement ``_draw(previous)``, where previous is the value drawn
+    before (None the first time), and return the rectangle they changed.
+
+    :param display: the display to draw on
+    :param x: the left of the rectangle
+    :param y: the top of the rectangle
+    :param width: the width of the rectangle
+    :param height: the height of the rectangle
+    :param value: the initial value, drawn right away
+    """
+
+    def __init__(self, display: _SSD1306, x: int, y: int, width: int, height: int, value=None):
+        self.display = display
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self._value = None
+        if value is not None:
+            self.value = value
+
+    @property
+    def value(self):
+        """The value shown by the widget"""
+        return self._value
+
+    @value.setter
+    def value(self, value) -> None:
+        if value == self._value:
+            return
+        previous = self._value
+        self._value = value
+        self.display.mark_dirty(*self._draw(previous))
+
+    def redraw(self) -> None:
+        """Draw the whole widget again, e.g. after the display was cleared"""
+        self.display.mark_dirty(*self._draw(None))
+
+    def _draw(self, previous) -> tuple:
+        raise NotImplementedError
+
+    def _clear(self) -> tuple:
+        """Clear the widget's rectangle and return it"""
+        self.display.fill_rect(self.x, self.y, self.width, self.height, 0)
+        return (self.x, self.y, self.width, self.height)
+
+
+class Label(Widget):
+    """
+    A line of text in the built in font. The rectangle is cleared and the text
+    drawn again when it changes. Room is made for 8 pixels per character, the
+    width of MicroPython's 8x8 font, which also fits the 5x8 font of
+    CircuitPython's framebuf.
+
+    :param chars: the most characters to make room for
+    :param size: the font scale; MicroPython's framebuf only draws size 1
+    """
+
+    def __init__(
+        self, display: _SSD1306, x: int, y: int, value: str = "", *, chars: int = 8, size: int = 1
+    ):
+        if size != 1 and _NATIVE_FRAMEBUF:
+            raise ValueError("MicroPython's framebuf only draws text at size 1")
+        self.size = size
+        super().__init__(display, x, y, chars * 8 * size, 8 * size)
+        self.value = value
+
+    def _draw(self, previous) -> tuple:
+        rect = self._clear()
+        if self.size == 1:
+            self.display.text(self._value, self.x, self.y, 1)
+        else:
+            self.display.text(self._value, self.x, self.y, 1, size=self.size)
+        return rect
+
+
+class ProgressBar(Widget):
+    """
+    An outlined bar filled in proportion to its value. Only the columns between
+    the old and the new fill level are redrawn.
+
+    :param minimum: the value of an empty bar
+    :param maximum: the value of a full bar
+    """
+
+    def __init__(
+        self,
+        display: _SSD1306,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        value: float = 0,
+        *,
+        minimum: float = 0,
+        maximum: float = 1,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        super().__init__(display, x, y, width, height)
+        self.value = value
+
+    def _level(self, value: float) -> int:
+        """The number of filled columns inside the outline"""
+        fraction = (value - self.minimum) / (self.maximum - self.minimum)
+        return int(min(max(fraction, 0), 1) * (self.width - 2) + 0.5)
+
+    def _draw(self, previous) -> tuple:
+        display = self.display
+        level = self._level(self._value)
+        if previous is None:
+            rect = self._clear()
+            display.rect(self.x, self.y, self.width, self.height, 1)
+            display.fill_rect(self.x + 1, self.y + 1, level, self.height - 2, 1)
+            return rect
+        old = self._level(previous)
+        start = self.x + 1 + min(old, level)
+        width = abs(level - old)
+        display.fill_rect(start, self.y + 1, width, self.height - 2, level > old)
+        return (start, self.y + 1, width, self.height - 2)
+
+
+class Gauge(Widget):
+    """
+    A half dial with a needle. Only the needle is redrawn when the value changes.
+
+    :param radius: the radius of the dial; the widget is ``2 * radius + 1``
+        pixels wide and ``radius + 1`` high
+    :param minimum: the value at the left end of the dial
+    :param maximum: the value at the right end of the dial
+    """
+
+    def __init__(
+        self,
+        display: _SSD1306,
+        x: int,
+        y: int,
+        radius: int,
+        value: float = 0,
+        *,
+        minimum: float = 0,
+        maximum: float = 1,
+    ):
+        self.radius = radius
+        self.minimum = minimum
+        self.maximum = maximum
+        super().__init__(display, x, y, 2 * radius + 1, radius + 1)
+        self.value = value
+
+    def _needle(self, value: float) -> tuple:
+        """The end points of the needle for a value"""
+        fraction = (value - self.minimum) / (self.maximum - self.minimum)
+        angle = math.pi * (1 - min(max(fraction, 0), 1))
+        length = self.radius - 2
+        center_x = self.x + self.radius
+        center_y = self.y + self.radius
+        return (
+            center_x,
+            center_y,
+            center_x + round(length * math.cos(angle)),
+            center_y - round(length * math.sin(angle)),
+        )
+
+    def _draw(self, previous) -> tuple:
+        display = self.display
+        new = self._needle(self._value)
+        if previous is None:
+            rect = self._clear()
+            radius = self.radius
+            steps = 4 * radius
+            for step in range(steps + 1):
+                angle = math.pi * step / steps
+                display.pixel(
+                    self.x + radius + round(radius * math.cos(angle)),
+                    self.y + radius - round(radius * math.sin(angle)),
+                    1,
+                )
+            display.line(*new, 1)
+            return rect
+        old = self._needle(previous)
+        display.line(*old, 0)
+        display.line(*new, 1)
+        left = min(old[2], new[2], new[0])
+        top = min(old[3], new[3])
+        return (left, top, max(old[2], new[2], new[0]) - left + 1, new[1] - top + 1)
+
+
+class Sparkline(Widget):
+    """
+    A line chart of the most recent samples, one per column. Add samples with
+    `push`; ``value`` is the tuple of samples shown.
+
+    :param minimum: the value at the bottom of the chart
+    :param maximum: the value at the top of the chart
+    """
+
+    def __init__(
+        self,
+        display: _SSD1306,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        *,
+        minimum: float = 0,
+        maximum: float = 1,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        super().__init__(display, x, y, width, height)
+
+    def push(self, sample: float) -> None:
+        """Add a sample at the right, scrolling older ones to the left"""
+        self.value = ((self._value or ()) + (sample,))[-self.width :]
+
+    def _draw(self, previous) -> tuple:
+        rect = self._clear()
+        scale = (self.height - 1) / (self.maximum - self.minimum)
+        bottom = self.y + self.height - 1
+        x = self.x + self.width - len(self._value)
+        last = None
+        for sample in self._value:
+            level = min(max(sample - self.minimum, 0) * scale, self.height - 1)
+            point = (x, bottom - int(level + 0.5))
+            if last:
+                self.display.line(*last, *point, 1)
+            else:
+                self.display.pixel(*point, 1)
+            last = point
+            x += 1
+        return rect
+
+
+class Icon(Widget):
+    """
+    One of several same sized MONO_VLSB bitmaps, chosen by the value: an index
+    into or key of ``bitmaps``. The icon replaces the pixels under it.
+
+    :param bitmaps: a sequence or dict of MONO_VLSB bitmaps
+    """
+
+    def __init__(
+        self, display: _SSD1306, x: int, y: int, width: int, height: int, bitmaps, value=0
+    ):
+        self.bitmaps = bitmaps
+        super().__init__(display, x, y, width, height, value)
+
+    def _draw(self, previous) -> tuple:
+        display = self.display
+        _blit_vlsb(
+            display._fb,
+            display.width,
+            display.height,
+            self.bitmaps[self._value],
+            self.width,
+            self.height,
+            self.x,
+            self.y,
+            True,
+        )
+        return (self.x, self.y, self.width, self.height)
+
+
+class AssetPack:
+    """
+    Bitmaps compiled ahead of time by ``python -m adafruit_ssd1306_tools compile``
+    into packed MONO_VLSB, so they can be drawn without PIL or any decoding. The
+    file is memory-mapped where possible; otherwise (e.g. on CircuitPython) it is
+    read in with ``readinto``. The format is::
+
+        b"SSDA", count (uint16)
+        count index entries: name (16 bytes, NUL padded), width (uint16),
+            height (uint16), frames (uint16), data offset (uint32)
+        the frames of each asset, width * ceil(height / 8) bytes each
+
+    :param path: the compiled file
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            try:
+                import mmap  # noqa: PLC0415
+
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ImportError, AttributeError, OSError):
+                file.seek(0, 2)
+                self._data = bytearray(file.tell())
+                file.seek(0)
+                file.readinto(self._data)
+        self._view = memoryview(self._data)
+        magic, count = struct.unpack_from("<4sH", self._data)
+        if magic != b"SSDA":
+            raise ValueError("not an asset pack")
+        self.assets = {}
+        for index in range(count):
+            name, width, height, frames, offset = struct.unpack_from(
+                _ASSET_ENTRY, self._data, 6 + index * struct.calcsize(_ASSET_ENTRY)
+            )
+            self.assets[name.rstrip(b"\0").decode()] = (width, height, frames, offset)
+
+    def size(self, name: str) -> tuple:
+        """The (width, height, frames) of an asset"""
+        return self.assets[name][:3]
+
+    def bitmap(self, name: str, frame: int = 0) -> memoryview:
+        """The MONO_VLSB bytes of a frame of an asset, without copying"""
+        width, height, frames, offset = self.assets[name]
+        if not 0 <= frame < frames:
+            raise IndexError("frame out of range")
+        size = width * ((height + 7) >> 3)
+        offset += frame * size
+        return self._view[offset : offset + size]
+
+    def blit(
+        self, display: _SSD1306, name: str, x: int = 0, y: int = 0, *, frame: int = 0, opaque=True
+    ) -> None:
+        """Draw a frame of an asset at (x, y) and mark it dirty. With opaque the
+        asset replaces the pixels under it, so an asset the size of the display,
+        drawn at (0, 0), is copied in page by page."""
+        width, height = self.assets[name][:2]
+        _blit_vlsb(
+            display._fb,
+            display.width,
+            display.height,
+            self.bitmap(name, frame),
+            width,
+            height,
+            x,
+            y,
+            opaque,
+        )
+        display.mark_dirty(x, y, width, height)
+
+    def close(self) -> None:
+        """Release the file. Bitmaps returned by `bitmap` must be gone first."""
+        self._view.release()
+        if hasattr(self._data, "close"):
+            self._data.close()
+
+
+_ASSET_ENTRY = "<16sHHHI"
+
+
+class SceneCarousel:
+    """
+    A set of prerendered screens to switch between, such as the pages of a kiosk
+    display. Scenes are stored a page (8 rows) at a time, with identical pages
+    shared between scenes. The column spans that differ between two scenes are
+    worked out on the first switch and cached, so later switches copy and send
+    only those spans.
+
+    If the framebuffer was drawn on since the last switch, what the panel shows is
+    unknown, so the next switch sends the whole scene.
+
+    :param display: the display to show the scenes on
+    """
+
+    def __init__(self, display: _SSD1306):
+        if display._buffer_pages != display.pages:
+            raise ValueError("Scenes need a display with a full framebuffer")
+        self.display = display
+        self.names = []
+        self.current = None
+        self._scenes = {}
+        self._pages = {}
+        self._deltas = {}
+
+    def add(self, name, pixels=None) -> None:
+        """Store a scene, or replace it, forgetting the deltas that involve it
+
+        :param name: any hashable name for the scene
+        :param pixels: the MONO_VLSB pixels of the scene, or the current
+            framebuffer contents by default
+        """
+        display = self.display
+        if pixels is None:
+            pixels = display._fb
+        width = display.width
+        pages = []
+        for page in range(display.pages):
+            row = bytes(pixels[page * width : (page + 1) * width])
+            # share identical pages between scenes
+            pages.append(self._pages.setdefault(row, row))
+        if name not in self._scenes:
+            self.names.append(name)
+        self._scenes[name] = tuple(pages)
+        self._deltas = {key: delta for key, delta in self._deltas.items() if name not in key}
+        if name == self.current:
+            self.current = None
+        self._prune()
+
+    def remove(self, name) -> None:
+        """Forget a scene"""
+        self.names.remove(name)
+        del self._scenes[name]
+        self._deltas = {key: delta for key, delta in self._deltas.items() if name not in key}
+        if name == self.current:
+            self.current = None
+        self._prune()
+
+    def show(self, name) -> None:
+        """Switch to a scene, sending only what differs from what is shown"""
+        display = self.display
+        scene = self._scenes[name]
+        width = display.width
+        fb = display._fb
+        current = self._scenes.get(self.current)
+        if current is not None and all(
+            fb[page * width : (page + 1) * width] == row for page, row in enumerate(current)
+        ):
+            key = (self.current, name)
+            if key not in self._deltas:
+                self._deltas[key] = _page_deltas(current, scene)
+            for page, start, end in self._deltas[key]:
+                fb[page * width + start : page * width + end + 1] = scene[page][start : end + 1]
+                display.mark_dirty(start, page * 8, end - start + 1, 8)
+            display.show(partial=True)
+        else:
+            for page, row in enumerate(scene):
+                fb[page * width : (page + 1) * width] = row
+            display.show()
+        self.current = name
+
+    def next(self) -> None:
+        """Switch to the scene after the current one, in the order they were added"""
+        if self.current in self._scenes:
+            index = (self.names.index(self.current) + 1) % len(self.names)
+        else:
+            index = 0
+        self.show(self.names[index])
+
+    def _prune(self) -> None:
+        """Drop stored pages no scene uses any more"""
+        used = {id(row) for scene in self._scenes.values() for row in scene}
+        self._pages = {row: row for row in self._pages.values() if id(row) in used}
+
+
+def _page_deltas(old, new) -> list:
+    """The (page, first column, last column) spans where two lists of pages differ"""
+    deltas = []
+    for page, (before, after) in enumerate(zip(old, new)):
+        if before == after:
+            continue
+        start = 0
+        while before[start] == after[start]:
+            start += 1
+        end = len(after) - 1
+        while before[end] == after[end]:
+            end -= 1
+        deltas.append((page, start, end))
+    return deltas
+
+
+class BusTracer:
+    """
+    Records every bus transaction of a display, to replay into an
+    `adafruit_ssd1306_tools.PanelEmulator` or to compare the traffic of two
+    versions of a program without hardware (see ``python -m adafruit_ssd1306_tools
+    replay`` and ``compare``). Set it as the display's ``tracer``. Each line of
+    the trace is a JSON object::
+
+        {"t": seconds since the trace began, "k": "c" for commands or "d" for
+         data, "b": the bytes in hex, "h": seconds the bus was held}
+        {"t": ..., "k": "cd", "b": ..., "d": ..., "h": ...}  (commands, then
+         the data in "d", sent in one transaction)
+        {"t": ..., "k": "s", "b": ..., "h": 0}  (commands that were not sent
+         but restore the addressing the display was in when tracing began)
+        {"t": ..., "k": "f"}  (a frame: show() was called)
+
+    :param path: the file to write
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "w")
+        self._start = time.monotonic()
+
+    def record(self, kind: str, data, began: float, display_data=None) -> None:
+        """Record a transaction that started at the `time.monotonic` time began.
+        For kind "cd", display_data holds the data sent after the commands."""
+        now = time.monotonic()
+        more = "" if display_data is None else f', "d": "{bytes(display_data).hex()}"'
+        self._file.write(
+            f'{{"t": {began - self._start:.6f}, "k": "{kind}", '
+            f'"b": "{bytes(data).hex()}"{more}, "h": {now - began:.6f}}}\n'
+        )
+
+    def frame(self) -> None:
+        """Mark the start of a frame"""
+        self._file.write(f'{{"t": {time.monotonic() - self._start:.6f}, "k": "f"}}\n')
+
+    def close(self) -> None:
+        """Finish the trace"""
+        self._file.close()
+
+
+def _blit_vlsb(
+    dst,
+    dst_width: int,
+    dst_height: int,
+    src,
+    src_width: int,
+    src_height: int,
+    x: int,
+    y: int,
+    opaque: bool = False,
+) -> None:
+    """Draw the MONO_VLSB bitmap src at (x, y) of the MONO_VLSB buffer dst. Set
+    pixels are ORed in, or with opaque the covered rectangle is replaced."""
+    x_0 = max(x, 0)
+    x_1 = min(x + src_width, dst_width)
+    y_0 = max(y, 0)
+    y_1 = min(y + src_height, dst_height)
+    if x_0 >= x_1 or y_0 >= y_1:
+        return
+    src_pages = (src_height + 7) >> 3
+    for page in range(y_0 >> 3, ((y_1 - 1) >> 3) + 1):
+        top = page * 8
+        # rows of this page covered by the bitmap
+        mask = (0xFF << max(y_0 - top, 0)) & (0xFF >> max(top + 8 - y_1, 0))
+        shift = top - y
+        bits = shift & 7
+        row = page * dst_width
+        if shift >= 0 and not bits and mask == 0xFF and opaque:
+            # page aligned, so a whole row of bytes can be copied
+            start = (shift >> 3) * src_width + x_0 - x
+            dst[row + x_0 : row + x_1] = src[start : start + x_1 - x_0]
+            continue
+        upper = (shift >> 3) * src_width - x if shift >= 0 else -1
+        lower = upper + src_width if shift >= 0 else -x
+        for column in range(x_0, x_1):
+            if shift >= 0:
+                byte = src[upper + column] >> bits
+                if bits and (shift >> 3) + 1 < src_pages:
+                    byte |= src[lower + column] << (8 - bits)
+            else:
+                byte = src[lower + column] << -shift
+            if opaque:
+                dst[row + column] = (dst[row + column] & ~mask) | (byte & mask)
+            else:
+                dst[row + column] |= byte & mask
+
+
+def _transpose8(src, s: int, s_step: int, dst, d: int, d_step: int) -> None:
+    """Transpose the 8x8 bit matrix in bytes src[s], src[s + s_step], ... into
+    dst[d], dst[d + d_step], ... (Hacker's Delight, transpose8rS32)"""
+    x = src[s] << 24 | src[s + s_step] << 16 | src[s + 2 * s_step] << 8 | src[s + 3 * s_step]
+    y = (
+        src[s + 4 * s_step] << 24
+        | src[s + 5 * s_step] << 16
+        | src[s + 6 * s_step] << 8
+        | src[s + 7 * s_step]
+    )
+    t = (x ^ (x >> 7)) & 0x00AA00AA
+    x = x ^ t ^ (t << 7)
+    t = (y ^ (y >> 7)) & 0x00AA00AA
+    y = y ^ t ^ (t << 7)
+    t = (x ^ (x >> 14)) & 0x0000CCCC
+    x = x ^ t ^ (t << 14)
+    t = (y ^ (y >> 14)) & 0x0000CCCC
+    y = y ^ t ^ (t << 14)
+    t = (x & 0xF0F0F0F0) | ((y >> 4) & 0x0F0F0F0F)
+    y = ((x << 4) & 0xF0F0F0F0) | (y & 0x0F0F0F0F)
+    dst[d] = t >> 24
+    dst[d + d_step] = (t >> 16) & 0xFF
+    dst[d + 2 * d_step] = (t >> 8) & 0xFF
+    dst[d + 3 * d_step] = t & 0xFF
+    dst[d + 4 * d_step] = y >> 24
+    dst[d + 5 * d_step] = (y >> 16) & 0xFF
+    dst[d + 6 * d_step] = (y >> 8) & 0xFF
+    dst[d + 7 * d_step] = y & 0xFF
+
+
+class Transport:
+    """
+    The interface through which `SSD1306_I2C` and `SSD1306_SPI` reach the bus, for
+    their ``transport`` argument: a context manager, held around each transaction,
+    with a `write` method like that of `I2CDevice` and `SPIDevice` (which can be
+    used as transports as they are). Fakes, bridges and other backends can subclass
+    this.
+
+    `writev` sends several buffers as one transfer. `SSD1306_I2C` uses it to send
+    the address window and the control byte in front of a slice of the
+    framebuffer without copying them into a staging buffer first; `SSD1306_SPI`
+    tells commands from data with the D/C pin, so it only needs `write`.
+    Backends that can gather buffers natively override `writev` and set
+    `vectored`; otherwise the buffers are joined.
+
+    `write_messages` sends each buffer as a message of its own. On I2C, backends
+    that can chain messages with repeated starts in one transfer override it and
+    set `chained`, and `SSD1306_I2C` then sends an address window and its data
+    together; otherwise each message is a separate `write`.
+    """
+
+    #: True if `writev` sends the buffers without copying them
+    vectored = False
+    #: True if `write_messages` sends its messages in one transfer
+    chained = False
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+    def write(self, buf, *, start: int = 0, end: Optional[int] = None) -> None:
+        """Write buf[start:end] as one transfer"""
+        raise NotImplementedError
+
+    def writev(self, *bufs) -> None:
+        """Write the buffers back to back as one transfer"""
+        self.write(b"".join(bufs))
+
+    def write_messages(self, *bufs) -> None:
+        """Write each buffer as a message of its own"""
+        for buf in bufs:
+            self.write(buf)
@@ -0,0 +1,473 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_ssd1306_linux`
+====================================================
+
+Extras for SSD1306 displays on Linux computers running CPython, e.g. a
+Raspberry Pi with Blinka. They need modules CircuitPython does not have, so they
+are kept out of `adafruit_ssd1306`.
+"""
+
+import ctypes
+import fcntl
+import mmap
+import queue
+import struct
+import threading
+import time
+
+import adafruit_framebuf
+from micropython import const
+
+import adafruit_ssd1306
+from adafruit_ssd1306 import DITHER_BAYER, DITHER_DIFFUSION, Transport
+
+try:
+    # Used only for typing
+    from typing import Optional
+
+    from adafruit_ssd1306 import _SSD1306
+except ImportError:
+    pass
+
+# Linux ioctl requests, see linux/i2c-dev.h and linux/spi/spidev.h
+_I2C_RDWR = const(0x0707)
+_I2C_FUNCS = const(0x0705)
+_I2C_FUNC_NOSTART = const(0x00000010)
+_I2C_M_NOSTART = const(0x4000)
+_SPI_IOC_MESSAGE_1 = const(0x40206B00)  # _IOW('k', 0, struct spi_ioc_transfer)
+_SPI_IOC_WR_MODE = const(0x40016B01)
+_SPI_IOC_WR_MAX_SPEED_HZ = const(0x40046B04)
+_SPIDEV_BUFSIZ = const(4096)
+
+
+class LinuxI2CTransport(Transport):
+    """
+    Talks to a Linux ``/dev/i2c-N`` bus directly with ``I2C_RDWR`` ioctls, bypassing
+    the busio and bus device layers. Pass it as the ``transport`` of
+    `adafruit_ssd1306.SSD1306_I2C`. `write_messages` chains its messages with
+    repeated starts in one ioctl, and if the adapter supports ``I2C_M_NOSTART``,
+    `writev` gathers its buffers into one message without copying them.
+
+    :param bus: the I2C bus number N
+    :param addr: the 7-bit bus address of the device
+    :param file: an already open file object to use instead of ``/dev/i2c-N``. If it
+        has an ``ioctl(request, arg)`` method that is called in place of `fcntl.ioctl`,
+        so a fake file can stand in for the bus.
+    """
+
+    chained = True
+
+    def __init__(self, bus: int = 1, addr: int = 0x3C, *, file=None):
+        if file is None:
+            file = open(f"/dev/i2c-{bus}", "r+b", buffering=0)
+        self.file = file
+        self.addr = addr
+        funcs = bytearray(struct.calcsize("L"))
+        try:
+            _ioctl(file, _I2C_FUNCS, funcs)
+            self.vectored = bool(struct.unpack("L", funcs)[0] & _I2C_FUNC_NOSTART)
+        except OSError:
+            self.vectored = False
+
+    def write(self, buf, *, start: int = 0, end: Optional[int] = None) -> None:
+        """Write buf[start:end] as a single message"""
+        self._transfer((memoryview(buf)[start:end],), 0)
+
+    def writev(self, *bufs) -> None:
+        """Write the buffers as one message"""
+        if self.vectored:
+            self._transfer(bufs, _I2C_M_NOSTART)
+        else:
+            super().writev(*bufs)
+
+    def write_messages(self, *bufs) -> None:
+        """Write each buffer as its own message, chained with repeated starts in
+        a single ``I2C_RDWR`` ioctl"""
+        self._transfer(bufs, 0)
+
+    def _transfer(self, bufs, flags: int) -> None:
+        """One I2C_RDWR ioctl with a message per buffer, with flags on all messages
+        but the first"""
+        size = struct.calcsize("HHHP")
+        msgs = bytearray(size * len(bufs))
+        keep = []
+        for i, buf in enumerate(bufs):
+            struct.pack_into(
+                "HHHP", msgs, i * size, self.addr, flags if i else 0, len(buf), _address(buf, keep)
+            )
+        rdwr = bytearray(struct.pack("PI", _address(msgs, keep), len(bufs)))
+        _ioctl(self.file, _I2C_RDWR, rdwr)
+
+    def close(self) -> None:
+        """Close the bus file"""
+        self.file.close()
+
+
+class LinuxSPITransport(Transport):
+    """
+    Talks to a Linux ``/dev/spidevB.D`` device directly with ``SPI_IOC_MESSAGE``
+    ioctls, bypassing the busio and bus device layers. Pass it as the ``transport``
+    of `adafruit_ssd1306.SSD1306_SPI`. The kernel drives chip select.
+
+    :param bus: the SPI bus number B
+    :param device: the chip select number D
+    :param baudrate: the SPI clock in Hz
+    :param polarity: the SPI clock polarity
+    :param phase: the SPI clock phase
+    :param file: an already open file object to use instead of ``/dev/spidevB.D``.
+        If it has an ``ioctl(request, arg)`` method that is called in place of
+        `fcntl.ioctl`, so a fake file can stand in for the device.
+    """
+
+    def __init__(
+        self,
+        bus: int = 0,
+        device: int = 0,
+        *,
+        baudrate: int = 8000000,
+        polarity: int = 0,
+        phase: int = 0,
+        file=None,
+    ):
+        if file is None:
+            file = open(f"/dev/spidev{bus}.{device}", "r+b", buffering=0)
+        self.file = file
+        self.baudrate = baudrate
+        _ioctl(file, _SPI_IOC_WR_MODE, bytearray(((polarity & 1) << 1 | (phase & 1),)))
+        _ioctl(file, _SPI_IOC_WR_MAX_SPEED_HZ, bytearray(struct.pack("I", baudrate)))
+
+    def write(self, buf, *, start: int = 0, end: Optional[int] = None) -> None:
+        """Write buf[start:end], split into transfers the spidev driver accepts"""
+        view = memoryview(buf)[start:end]
+        for offset in range(0, len(view), _SPIDEV_BUFSIZ):
+            self._transfer(view[offset : offset + _SPIDEV_BUFSIZ])
+
+    def _transfer(self, buf) -> None:
+        """One ``SPI_IOC_MESSAGE`` ioctl with a single transfer of at most the
+        spidev ``bufsiz`` (4096 bytes by default)"""
+        transfer = bytearray(32)
+        keep = []
+        struct.pack_into("=QQII8x", transfer, 0, _address(buf, keep), 0, len(buf), self.baudrate)
+        _ioctl(self.file, _SPI_IOC_MESSAGE_1, transfer)
+
+    def close(self) -> None:
+        """Close the device file"""
+        self.file.close()
+
+
+def _address(buf, keep: list) -> int:
+    """The memory address of a buffer's first byte, for handing to the kernel.
+    Read-only buffers are copied; keep holds references until the ioctl is done."""
+    if not len(buf):
+        return 0
+    try:
+        char = ctypes.c_char.from_buffer(buf)
+    except TypeError:
+        char = ctypes.c_char.from_buffer(bytearray(buf))
+    keep.append(char)
+    return ctypes.addressof(char)
+
+
+def _ioctl(file, request: int, arg: bytearray) -> None:
+    if hasattr(file, "ioctl"):
+        file.ioctl(request, arg)
+    else:
+        fcntl.ioctl(file.fileno(), request, arg)
+
+
+class SharedFrameBuffer:
+    """
+    A framebuffer in a memory-mapped file, by default in ``/dev/shm``, so renderers in
+    other processes (or other programs) can draw while the process that owns the
+    display flushes it. A small header holds the size, a generation counter and a
+    dirty flag per page::
+
+        offset 0: b"SSD1", width (uint16), height (uint16), generation (uint32),
+        offset 12: one dirty byte per page, one spare byte, then the pixels
+
+    The owner passes `buffer` (I2C) or `pixels` (SPI) as the display's ``buffer``
+    and runs `serve`. Renderers draw into `pixels`, for example through
+    `framebuffer`, then `commit` the rows they changed.
+
+    :param path: a file path, or a name in ``/dev/shm``
+    :param width: the width in pixels, when creating
+    :param height: the height in pixels, when creating
+    :param create: create (or reset) the file instead of opening an existing one
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        *,
+        create: bool = False,
+    ):
+        if "/" not in path:
+            path = "/dev/shm/" + path
+        if create:
+            with open(path, "wb") as file:
+                file.write(bytes(13 + height // 8 * (width + 1)))
+        with open(path, "r+b") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0)
+        if create:
+            struct.pack_into("<4sHHI", self._mmap, 0, b"SSD1", width, height, 0)
+        magic, self.width, self.height, _ = struct.unpack_from("<4sHHI", self._mmap)
+        if magic != b"SSD1":
+            raise ValueError("not a shared framebuffer")
+        self.pages = self.height // 8
+        view = memoryview(self._mmap)
+        self._flags = view[12 : 12 + self.pages]
+        # the spare byte in front of the pixels takes the I2C control byte
+        self.buffer = view[12 + self.pages :]
+        self.pixels = self.buffer[1:]
+        self._seen = -1
+
+    @property
+    def generation(self) -> int:
+        """Incremented by every `commit`"""
+        return struct.unpack_from("<I", self._mmap, 8)[0]
+
+    def framebuffer(self) -> adafruit_framebuf.FrameBuffer:
+        """A framebuffer for drawing into the shared pixels"""
+        return adafruit_framebuf.FrameBuffer(
+            self.pixels, self.width, self.height, adafruit_framebuf.MVLSB
+        )
+
+    def commit(self, y: int = 0, height: Optional[int] = None) -> None:
+        """Publish changes to the rows y..y+height-1 (all rows by default)"""
+        if height is None:
+            height = self.height - y
+        for page in range(max(y, 0) >> 3, min((y + height - 1) >> 3, self.pages - 1) + 1):
+            self._flags[page] = 1
+        struct.pack_into("<I", self._mmap, 8, (self.generation + 1) & 0xFFFFFFFF)
+
+    def flush(self, display: _SSD1306) -> bool:
+        """Send the pages committed since the last flush; False if there were none"""
+        generation = self.generation
+        if generation == self._seen:
+            return False
+        self._seen = generation
+        for page in range(self.pages):
+            if self._flags[page]:
+                # clear before sending, so a commit that races with us is not lost
+                self._flags[page] = 0
+                display.mark_dirty(0, page * 8, display.width, 8)
+        display.show(partial=True)
+        return True
+
+    def serve(self, display: _SSD1306, *, interval: float = 0.005, stop=None) -> None:
+        """Flush committed changes until stop() returns True, polling every interval
+        seconds while nothing changes"""
+        while not (stop and stop()):
+            if not self.flush(display):
+                time.sleep(interval)
+
+    def close(self) -> None:
+        """Unmap the file. Framebuffers and displays using it must be gone first."""
+        self._flags.release()
+        self.pixels.release()
+        self.buffer.release()
+        self._mmap.close()
+
+
+class AnimationPlayer:
+    """
+    Plays an animation, such as an animated GIF opened with PIL, paced to the
+    frame durations of the source. A worker thread decodes and converts frames
+    ahead of playback into ready MONO_VLSB buffers, so each frame costs the main
+    thread a copy and the transfer of the pages that changed. Converted frames
+    are kept in a least recently used cache, so a looping animation that fits in
+    it is only decoded once.
+
+    :param display: the display to play on
+    :param source: a PIL image with one or more frames (seeked frame by frame),
+        or an iterable of PIL images, such as frames decoded from a video. An
+        iterable is read once; when looping only the frames still in the cache
+        are replayed.
+    :param loop: start over at the end of the source
+    :param cache_size: how many converted frames to keep
+    :param prefetch: how many frames the worker may convert ahead
+    :param duration: seconds per frame for frames without a ``duration``
+    :param dither: how grayscale frames are converted, as for ``image_gray``
+    """
+
+    def __init__(
+        self,
+        display: _SSD1306,
+        source,
+        *,
+        loop: bool = True,
+        cache_size: int = 64,
+        prefetch: int = 4,
+        duration: float = 0.1,
+        dither: int = DITHER_BAYER,
+    ):
+        if display._buffer_pages != display.pages:
+            raise ValueError("Animations need a display with a full framebuffer")
+        self.display = display
+        self.loop = loop
+        self.cache_size = cache_size
+        self.duration = duration
+        self.dither = dither
+        self.decoded = 0
+        self.cache_hits = 0
+        self.late_frames = 0
+        self._source = source
+        self._iterator = None if hasattr(source, "seek") else iter(source)
+        # frame index: (pixels, seconds), least recently used first
+        self._cache = {}
+        self._queue = queue.Queue(prefetch)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._due = None
+        self._error = None
+        self._done = False
+        self._started = False
+
+    def start(self) -> None:
+        """Start converting frames; done by the first `step` if not called"""
+        if not self._started:
+            self._started = True
+            self._thread.start()
+
+    def step(self) -> bool:
+        """Wait until the next frame is due and show it. Returns False at the end.
+        An error in decoding or converting a frame is raised here."""
+        if self._done:
+            return False
+        self.start()
+        frame = self._queue.get()
+        if frame is None:
+            self._done = True
+            if self._error is not None:
+                raise self._error
+            return False
+        pixels, duration = frame
+        now = time.monotonic()
+        if self._due is None:
+            self._due = now
+        elif now < self._due:
+            time.sleep(self._due - now)
+        elif now - self._due > duration:
+            # more than a frame behind: show it now rather than rushing to catch up
+            self.late_frames += 1
+            self._due = now
+        display = self.display
+        buffer = display._fb
+        width = display.width
+        for page in range(display.pages):
+            row = page * width
+            if buffer[row : row + width] != pixels[row : row + width]:
+                buffer[row : row + width] = pixels[row : row + width]
+                display.mark_dirty(0, page * 8, width, 8)
+        display.show(partial=True)
+        self._due += duration
+        return True
+
+    def play(self, *, frames: Optional[int] = None, stop=None) -> None:
+        """Show frames until the end, until ``frames`` have been shown, or until
+        stop() returns True"""
+        while (frames is None or frames > 0) and not (stop and stop()):
+            if not self.step():
+                break
+            if frames is not None:
+                frames -= 1
+
+    def close(self) -> None:
+        """Stop the worker thread"""
+        self._stop.set()
+        self._done = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        """The worker: convert frames, then always mark the end, passing an error
+        in the source on to `step`"""
+        try:
+            self._produce()
+        except Exception as error:
+            self._error = error
+        finally:
+            self._put(None)
+
+    def _produce(self) -> None:
+        """Convert frames in order, putting them in the queue"""
+        cache = self._cache
+        index = 0
+        # the number of frames in an iterable source, once it has run out
+        length = None
+        while not self._stop.is_set():
+            if index == length:
+                index = 0
+            if length is not None and not cache:
+                break
+            frame = cache.pop(index, None)
+            if frame is None:
+                if length is not None:
+                    # an iterable is read once: skip the frames no longer cached
+                    index += 1
+                    continue
+                image = self._decode(index)
+                if image is None:
+                    if not (self.loop and index):
+                        break
+                    if self._iterator is not None:
+                        length = index
+                    index = 0
+                    continue
+                frame = self._convert(image)
+                self.decoded += 1
+            else:
+                self.cache_hits += 1
+            cache[index] = frame
+            while len(cache) > self.cache_size:
+                del cache[next(iter(cache))]
+            if not self._put(frame):
+                return
+            index += 1
+
+    def _put(self, frame) -> bool:
+        """Queue a frame, giving up if the player is closed"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(frame, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _decode(self, index: int):
+        """The image of a frame, or None past the end of the source"""
+        if self._iterator is not None:
+            return next(self._iterator, None)
+        try:
+            self._source.seek(index)
+        except EOFError:
+            return None
+        return self._source
+
+    def _convert(self, image) -> tuple:
+        """A frame's pixels as MONO_VLSB bytes and its duration in seconds"""
+        duration = image.info.get("duration")
+        duration = duration / 1000 if duration else self.duration
+        width = self.display.width
+        height = self.display.height
+        if image.size != (width, height):
+            image = image.resize((width, height))
+        pixels = bytearray(width * height // 8)
+        if image.mode == "1":
+            adafruit_ssd1306._image1_to_vlsb(image, pixels)
+        elif self.dither == DITHER_DIFFUSION:
+            adafruit_ssd1306._image1_to_vlsb(image.convert("1"), pixels)
+        else:
+            pixels = adafruit_ssd1306._gray_to_vlsb(
+                image.convert("L").tobytes(), width, height, self.dither, 128
+            )
+        return bytes(pixels), duration
@@ -0,0 +1,544 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_ssd1306_tools`
+====================================================
+
+Host tools for SSD1306 displays, run as ``python -m adafruit_ssd1306_tools
+COMMAND``:
+
+* ``compile``: compile images and sprite sheets into an
+  `adafruit_ssd1306.AssetPack` file
+* ``replay``: replay an `adafruit_ssd1306.BusTracer` trace into a
+  `PanelEmulator` and show the result
+* ``compare``: compare the bus traffic per frame of two traces
+* ``stream``: show raw frames read from stdin or a file (e.g. a FIFO) on a display
+"""
+
+import argparse
+import json
+import struct
+import sys
+import threading
+import time
+
+import adafruit_ssd1306
+from adafruit_ssd1306 import (
+    DITHER_DIFFUSION,
+    DITHER_THRESHOLD,
+    SET_COL_ADDR,
+    SET_CONTRAST,
+    SET_MEM_ADDR,
+    SET_NORM_INV,
+    SET_PAGE_ADDR,
+    SET_SEG_REMAP,
+    SSD1306_I2C,
+    SSD1306_SPI,
+)
+
+try:
+    # Used only for typing
+    from typing import Optional, Sequence
+
+    from adafruit_ssd1306 import _SSD1306
+except ImportError:
+    pass
+
+
+class PanelEmulator:
+    """
+    A model of the SSD1306 display RAM and its addressing, fed with the commands
+    and data a driver sends, e.g. from an `adafruit_ssd1306.BusTracer` trace. Only
+    what affects the RAM contents is modelled: the addressing modes and windows,
+    page addressing, and the one column content scroll. The contrast and
+    inversion registers are kept too.
+
+    :param pages: the number of 8 pixel pages of RAM
+    """
+
+    def __init__(self, pages: int = 8):
+        self.pages = pages
+        self.ram = bytearray(128 * pages)
+        self.mode = 0x02
+        self.columns = (0, 127)
+        self.page_range = (0, pages - 1)
+        self.column = 0
+        self.page = 0
+        self.remapped = False
+        self.contrast = 0x7F
+        self.inverted = False
+        self._command = None
+        self._args = bytearray()
+
+    def command(self, cmds) -> None:
+        """Process command bytes"""
+        for byte in cmds:
+            if self._command is None:
+                if not _PANEL_ARGS.get(byte, 0):
+                    self._apply(byte, b"")
+                    continue
+                self._command = byte
+                self._args = bytearray()
+                continue
+            self._args.append(byte)
+            if len(self._args) == _PANEL_ARGS[self._command]:
+                command = self._command
+                self._command = None
+                self._apply(command, self._args)
+
+    def data(self, data) -> None:
+        """Write data bytes to RAM, advancing the address as the panel would"""
+        for byte in data:
+            self.ram[self.page % self.pages * 128 + self.column] = byte
+            if self.mode == 0x00:
+                self.column += 1
+                if self.column > self.columns[1]:
+                    self.column = self.columns[0]
+                    self.page = (
+                        self.page + 1 if self.page < self.page_range[1] else self.page_range[0]
+                    )
+            elif self.mode == 0x01:
+                self.page += 1
+                if self.page > self.page_range[1]:
+                    self.page = self.page_range[0]
+                    self.column = (
+                        self.column + 1 if self.column < self.columns[1] else self.columns[0]
+                    )
+            else:
+                self.column = (self.column + 1) & 0x7F
+
+    def feed_i2c(self, writes) -> None:
+        """Process I2C writes, each starting with a control byte: Co=1 for a
+        single command byte that another control byte follows, otherwise a
+        stream of commands or, with D/C#=1, of data"""
+        for write in writes:
+            index = 0
+            while index < len(write):
+                control = write[index]
+                index += 1
+                if control & 0x40:
+                    self.data(write[index:])
+                    break
+                if not control & 0x80:
+                    self.command(write[index:])
+                    break
+                self.command(write[index : index + 1])
+                index += 1
+
+    def feed_spi(self, writes) -> None:
+        """Process SPI writes, as pairs of the D/C pin level and the bytes sent"""
+        for data, write in writes:
+            if data:
+                self.data(write)
+            else:
+                self.command(write)
+
+    def replay(self, path: str) -> None:
+        """Feed the transactions of an `adafruit_ssd1306.BusTracer` trace"""
+        with open(path) as file:
+            for line in file:
+                event = json.loads(line)
+                if event["k"] in {"c", "s", "cd"}:
+                    self.command(bytes.fromhex(event["b"]))
+                if event["k"] == "d":
+                    self.data(bytes.fromhex(event["b"]))
+                elif event["k"] == "cd":
+                    self.data(bytes.fromhex(event["d"]))
+
+    def visible(self, width: int = 128, height: Optional[int] = None) -> bytes:
+        """The MONO_VLSB contents of the RAM a display of this size shows"""
+        offset = (128 - width) // 2
+        return b"".join(
+            self.ram[page * 128 + offset : page * 128 + offset + width]
+            for page in range((height or self.pages * 8) // 8)
+        )
+
+    def _apply(self, command: int, args) -> None:
+        if command == SET_MEM_ADDR:
+            self.mode = args[0] & 0x03
+        elif command == SET_COL_ADDR:
+            self.columns = (args[0] & 0x7F, args[1] & 0x7F)
+            self.column = self.columns[0]
+        elif command == SET_PAGE_ADDR:
+            self.page_range = (args[0] & 0x07, args[1] & 0x07)
+            self.page = self.page_range[0]
+        elif 0xB0 <= command <= 0xB7:
+            self.page = command & 0x07
+        elif command < 0x10:
+            self.column = (self.column & 0xF0) | command
+        elif command < 0x20:
+            self.column = (self.column & 0x0F) | (command & 0x07) << 4
+        elif command in {SET_SEG_REMAP, SET_SEG_REMAP | 0x01}:
+            self.remapped = bool(command & 0x01)
+        elif command == SET_CONTRAST:
+            self.contrast = args[0]
+        elif command in {SET_NORM_INV, SET_NORM_INV | 0x01}:
+            self.inverted = bool(command & 0x01)
+        elif command in {0x2C, 0x2D}:
+            # content moves towards lower columns when it scrolls towards SEG0
+            lower = (command == 0x2C) == self.remapped
+            for page in range(args[1] & 0x07, (args[3] & 0x07) + 1):
+                row = page * 128
+                if lower:
+                    self.ram[row : row + 127] = self.ram[row + 1 : row + 128]
+                else:
+                    self.ram[row + 1 : row + 128] = self.ram[row : row + 127]
+
+
+# the number of argument bytes of commands that take any
+_PANEL_ARGS = {
+    0x20: 1,
+    0x21: 2,
+    0x22: 2,
+    0x23: 1,
+    0x26: 6,
+    0x27: 6,
+    0x29: 5,
+    0x2A: 5,
+    0x2C: 6,
+    0x2D: 6,
+    0x81: 1,
+    0x8D: 1,
+    0xA3: 2,
+    0xA8: 1,
+    0xAD: 1,
+    0xD3: 1,
+    0xD5: 1,
+    0xD6: 1,
+    0xD9: 1,
+    0xDA: 1,
+    0xDB: 1,
+}
+
+
+def _compile_image(image, frame_width: int, frame_height: int, dither: int, threshold: int):
+    """Cut a PIL image into frames, left to right and top to bottom, and pack
+    each frame as MONO_VLSB"""
+    from PIL import Image  # noqa: PLC0415
+
+    data = bytearray()
+    padded = (frame_height + 7) & ~7
+    for top in range(0, image.size[1] - frame_height + 1, frame_height):
+        for left in range(0, image.size[0] - frame_width + 1, frame_width):
+            frame = image.crop((left, top, left + frame_width, top + frame_height))
+            if image.mode == "1" or dither == DITHER_DIFFUSION:
+                page = Image.new("1", (frame_width, padded))
+                page.paste(frame.convert("1"), (0, 0))
+                pixels = bytearray(frame_width * padded // 8)
+                adafruit_ssd1306._image1_to_vlsb(page, pixels)
+            else:
+                page = Image.new("L", (frame_width, padded))
+                page.paste(frame.convert("L"), (0, 0))
+                pixels = adafruit_ssd1306._gray_to_vlsb(
+                    page.tobytes(), frame_width, padded, dither, threshold
+                )
+            data += pixels
+    return data
+
+
+def _compile_assets(args) -> None:
+    """The ``compile`` command"""
+    from PIL import Image  # noqa: PLC0415
+
+    entries = []
+    for spec in args.images:
+        # [name=]path[:WIDTHxHEIGHT]
+        name, _, path = spec.rpartition("=")
+        path, _, frame_size = path.partition(":")
+        image = Image.open(path)
+        if image.mode not in {"1", "L"}:
+            image = image.convert("L")
+        if frame_size:
+            width, height = (int(size) for size in frame_size.split("x"))
+        else:
+            width, height = image.size
+        if not name:
+            name = path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+        data = _compile_image(image, width, height, args.dither, args.threshold)
+        entries.append((name.encode()[:16], width, height, data))
+    entry_size = struct.calcsize(adafruit_ssd1306._ASSET_ENTRY)
+    offset = 6 + len(entries) * entry_size
+    with open(args.output, "wb") as file:
+        file.write(struct.pack("<4sH", b"SSDA", len(entries)))
+        for name, width, height, data in entries:
+            frames = len(data) // (width * ((height + 7) >> 3))
+            file.write(
+                struct.pack(adafruit_ssd1306._ASSET_ENTRY, name, width, height, frames, offset)
+            )
+            offset += len(data)
+        for entry in entries:
+            file.write(entry[3])
+
+
+def _trace_stats(path: str) -> dict:
+    """Totals of a BusTracer trace, counting from the first frame on"""
+    stats = {"frames": 0, "transactions": 0, "bytes": 0, "held": 0.0}
+    with open(path) as file:
+        for line in file:
+            event = json.loads(line)
+            if event["k"] == "f":
+                stats["frames"] += 1
+            elif stats["frames"] and event["k"] != "s":
+                stats["transactions"] += 1
+                stats["bytes"] += (len(event["b"]) + len(event.get("d", ""))) // 2
+                stats["held"] += event["h"]
+    return stats
+
+
+def _replay_trace(args) -> None:
+    """The ``replay`` command"""
+    panel = PanelEmulator((args.height + 7) // 8)
+    panel.replay(args.trace)
+    pixels = panel.visible(args.width, args.height)
+    stats = _trace_stats(args.trace)
+    print(
+        f"{stats['frames']} frames, {stats['transactions']} transactions, "
+        f"{stats['bytes']} bytes, bus held {stats['held'] * 1000:.1f}ms"
+    )
+    rows = [
+        [pixels[(y >> 3) * args.width + x] >> (y & 7) & 1 for x in range(args.width)]
+        for y in range(args.height)
+    ]
+    if args.pbm:
+        with open(args.pbm, "wb") as file:
+            file.write(b"P4\n%d %d\n" % (args.width, args.height))
+            for row in rows:
+                file.write(
+                    bytes(
+                        sum(bit << (7 - index) for index, bit in enumerate(row[x : x + 8]))
+                        for x in range(0, args.width, 8)
+                    )
+                )
+    else:
+        for row in rows:
+            print("".join("#" if bit else "." for bit in row))
+
+
+def _compare_traces(args) -> None:
+    """The ``compare`` command"""
+    old = _trace_stats(args.old)
+    new = _trace_stats(args.new)
+    print(f"{'per frame':<14}{'old':>12}{'new':>12}{'change':>10}")
+    for key in ("transactions", "bytes", "held"):
+        before = old[key] / max(old["frames"], 1)
+        after = new[key] / max(new["frames"], 1)
+        change = f"{(after - before) * 100 / before:+.1f}%" if before else "-"
+        print(f"{key:<14}{before:>12.6g}{after:>12.6g}{change:>10}")
+    print(f"{'frames':<14}{old['frames']:>12}{new['frames']:>12}")
+
+
+def _open_display(args) -> _SSD1306:
+    """The display described by the ``stream`` command's options"""
+    if args.spidev:
+        import board  # noqa: PLC0415
+        import digitalio  # noqa: PLC0415
+
+        from adafruit_ssd1306_linux import LinuxSPITransport  # noqa: PLC0415
+
+        bus, _, device = args.spidev.partition(".")
+        return SSD1306_SPI(
+            args.width,
+            args.height,
+            None,
+            digitalio.DigitalInOut(getattr(board, args.dc)),
+            digitalio.DigitalInOut(getattr(board, args.reset)) if args.reset else None,
+            None,
+            transport=LinuxSPITransport(int(bus), int(device or 0), baudrate=args.baudrate),
+        )
+    if args.i2c_bus is not None:
+        from adafruit_ssd1306_linux import LinuxI2CTransport  # noqa: PLC0415
+
+        transport = LinuxI2CTransport(args.i2c_bus, args.addr)
+        return SSD1306_I2C(args.width, args.height, None, addr=args.addr, transport=transport)
+    import board  # noqa: PLC0415
+
+    return SSD1306_I2C(args.width, args.height, board.I2C(), addr=args.addr)
+
+
+def _mono_to_vlsb(data, width: int, height: int) -> bytes:
+    """Repack 1 bit pixels, row by row with the leftmost pixel in the most
+    significant bit, as MONO_VLSB"""
+    try:
+        from PIL import Image  # noqa: PLC0415
+    except ImportError:
+        stride = (width + 7) // 8
+        gray = bytes(
+            data[y * stride + (x >> 3)] >> (7 - (x & 7)) & 1
+            for y in range(height)
+            for x in range(width)
+        )
+        return adafruit_ssd1306._gray_to_vlsb(gray, width, height, DITHER_THRESHOLD, 1)
+    pixels = bytearray(width * height // 8)
+    adafruit_ssd1306._image1_to_vlsb(Image.frombytes("1", (width, height), bytes(data)), pixels)
+    return pixels
+
+
+def _stream(args, display: Optional[_SSD1306] = None) -> None:
+    """The ``stream`` command"""
+    if display is None:
+        display = _open_display(args)
+    width = display.width
+    height = display.height
+    size = {
+        "vlsb": width * height // 8,
+        "mono": (width + 7) // 8 * height,
+        "gray": width * height,
+    }[args.format]
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    # the reader keeps only the newest frame, so a slow bus drops stale ones
+    latest = [None, 0.0, False]
+    stats = {"read": 0, "dropped": 0, "shown": 0, "latency": 0.0}
+    ready = threading.Condition()
+
+    def read() -> None:
+        while True:
+            frame = bytearray(size)
+            view = memoryview(frame)
+            got = 0
+            while got < size:
+                count = source.readinto(view[got:])
+                if not count:
+                    break
+                got += count
+            with ready:
+                if got < size:
+                    latest[2] = True
+                    ready.notify()
+                    return
+                if latest[0] is not None:
+                    stats["dropped"] += 1
+                latest[0] = frame
+                latest[1] = time.monotonic()
+                stats["read"] += 1
+                ready.notify()
+
+    threading.Thread(target=read, daemon=True).start()
+    started = reported = time.monotonic()
+    while True:
+        with ready:
+            while latest[0] is None and not latest[2]:
+                ready.wait()
+            frame, arrived, _ = latest
+            latest[0] = None
+        if frame is None:
+            break
+        if args.format == "mono":
+            frame = _mono_to_vlsb(frame, width, height)
+        elif args.format == "gray":
+            frame = adafruit_ssd1306._gray_to_vlsb(
+                frame, width, height, args.dither, args.threshold
+            )
+        _show_changes(display, frame)
+        now = time.monotonic()
+        stats["shown"] += 1
+        stats["latency"] += now - arrived
+        if args.stats and now - reported >= args.stats:
+            _print_stream_stats(stats, now - started)
+            reported = now
+    if source is not sys.stdin.buffer:
+        source.close()
+    if args.stats:
+        _print_stream_stats(stats, time.monotonic() - started)
+
+
+def _show_changes(display: _SSD1306, frame) -> None:
+    """Send only the columns of each page that differ from what is on the display"""
+    fb = display._fb
+    width = display.width
+    old = [fb[page * width : (page + 1) * width] for page in range(display.pages)]
+    new = [frame[page * width : (page + 1) * width] for page in range(display.pages)]
+    for page, start, end in adafruit_ssd1306._page_deltas(old, new):
+        fb[page * width + start : page * width + end + 1] = new[page][start : end + 1]
+        display.mark_dirty(start, page * 8, end - start + 1, 8)
+    display.show(partial=True)
+
+
+def _print_stream_stats(stats: dict, elapsed: float) -> None:
+    shown = max(stats["shown"], 1)
+    print(
+        f"{stats['shown'] / elapsed:.1f} fps, {stats['dropped']} of {stats['read']} frames "
+        f"dropped, {stats['latency'] * 1000 / shown:.1f}ms average latency",
+        flush=True,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the command line tools"""
+    parser = argparse.ArgumentParser(prog="python -m adafruit_ssd1306_tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser(
+        "compile", help="compile images and sprite sheets into an AssetPack file"
+    )
+    command.add_argument("output", help="the asset pack file to write")
+    command.add_argument(
+        "images",
+        nargs="+",
+        help="[NAME=]PATH[:WIDTHxHEIGHT], cut into frames of WIDTHxHEIGHT if given; "
+        "NAME defaults to the file name without extension",
+    )
+    command.add_argument(
+        "--dither",
+        choices=("threshold", "bayer", "diffusion"),
+        default="threshold",
+        help="how grayscale and color images become 1 bit",
+    )
+    command.add_argument("--threshold", type=int, default=128)
+    command.set_defaults(run=_compile_assets)
+    command = commands.add_parser(
+        "replay", help="replay a BusTracer trace into a panel emulator and show the result"
+    )
+    command.add_argument("trace")
+    command.add_argument("--width", type=int, default=128)
+    command.add_argument("--height", type=int, default=64)
+    command.add_argument("--pbm", help="write the panel contents to this PBM image")
+    command.set_defaults(run=_replay_trace)
+    command = commands.add_parser(
+        "compare", help="compare the bus traffic per frame of two BusTracer traces"
+    )
+    command.add_argument("old")
+    command.add_argument("new")
+    command.set_defaults(run=_compare_traces)
+    command = commands.add_parser(
+        "stream", help="show raw frames read from stdin or a file (e.g. a FIFO) on a display"
+    )
+    command.add_argument("--input", default="-", help="where to read frames, stdin by default")
+    command.add_argument(
+        "--format",
+        choices=("vlsb", "mono", "gray"),
+        default="gray",
+        help="packed MONO_VLSB, 1 bit rows (most significant bit first, like "
+        "ffmpeg's monob), or 8 bit grayscale rows (ffmpeg's gray)",
+    )
+    command.add_argument("--width", type=int, default=128)
+    command.add_argument("--height", type=int, default=64)
+    command.add_argument(
+        "--dither",
+        choices=("threshold", "bayer", "diffusion"),
+        default="bayer",
+        help="how grayscale frames become 1 bit",
+    )
+    command.add_argument("--threshold", type=int, default=128)
+    command.add_argument(
+        "--addr", type=lambda value: int(value, 0), default=0x3C, help="the I2C address"
+    )
+    command.add_argument(
+        "--i2c-bus", type=int, help="use /dev/i2c-N directly instead of board.I2C()"
+    )
+    command.add_argument("--spidev", help="use SPI through /dev/spidevB.D, given as B.D")
+    command.add_argument("--dc", default="D25", help="the board pin for D/C with SPI")
+    command.add_argument("--reset", help="the board pin for reset with SPI")
+    command.add_argument("--baudrate", type=int, default=8000000)
+    command.add_argument(
+        "--stats", type=float, default=1.0, help="seconds between statistics, 0 for none"
+    )
+    command.set_defaults(run=_stream)
+    args = parser.parse_args(argv)
+    if hasattr(args, "dither"):
+        args.dither = ("threshold", "bayer", "diffusion").index(args.dither)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Stand-ins for buses, pins and transports, recording what a driver sent so that
+it can be fed to `adafruit_ssd1306_tools.PanelEmulator`"""
+
+from adafruit_ssd1306 import Transport
+
+
+class FakeI2C:
+    """A busio.I2C that records each write"""
+
+    def __init__(self):
+        self.log = []
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto(self, addr, buf, *, start=0, end=None):
+        self.log.append(bytes(buf[start:end]))
+
+
+class FakeSPI:
+    """A busio.SPI that records each write with the level of the D/C pin"""
+
+    def __init__(self, dc):
+        self.log = []
+        self.dc = dc
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def write(self, buf, *, start=0, end=None):
+        self.log.append((self.dc.value, bytes(buf[start:end])))
+
+
+class FakePin:
+    """A digitalio.DigitalInOut"""
+
+    def __init__(self):
+        self.value = 0
+
+    def switch_to_output(self, value=0, **kwargs):
+        self.value = value
+
+
+class NullTransport(Transport):
+    """A transport that drops everything, without allocating"""
+
+    def write(self, buf, *, start=0, end=None):
+        pass
+
+
+class RecordingTransport(Transport):
+    """A transport that records each write"""
+
+    def __init__(self):
+        self.log = []
+
+    def write(self, buf, *, start=0, end=None):
+        self.log.append(bytes(buf[start:end]))
+
+
+class GatheringTransport(RecordingTransport):
+    """A transport that records each write, and gathers writev into one write"""
+
+    vectored = True
+
+    def writev(self, *bufs):
+        self.log.append(b"".join(bytes(buf) for buf in bufs))
@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""The per-frame paths must not allocate, so that a long running program does
+not fragment the heap of a microcontroller"""
+
+import tracemalloc
+
+import pytest
+from fakes import FakePin, NullTransport
+
+import adafruit_ssd1306
+
+
+def i2c():
+    return adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=NullTransport())
+
+
+def i2c_pages():
+    return adafruit_ssd1306.SSD1306_I2C(
+        128, 64, None, transport=NullTransport(), page_addressing=True
+    )
+
+
+def i2c_shared():
+    return adafruit_ssd1306.SSD1306_I2C(
+        128, 64, None, transport=NullTransport(), buffer=bytearray(1025)
+    )
+
+
+def spi():
+    return adafruit_ssd1306.SSD1306_SPI(
+        128, 64, None, FakePin(), None, None, transport=NullTransport()
+    )
+
+
+def partial(display):
+    display.mark_dirty(10, 10, 40, 20)
+    display.show(partial=True)
+
+
+# Each call with the most memory it may use while running. CPython needs some of
+# its own that MicroPython keeps on the stack: the bound __enter__ and __exit__
+# of a with statement, range objects and their iterators, and integers over 256.
+# A slice or a *args tuple on top of that goes over. Small new buffers can fit
+# in the slack, so the test after this one counts them instead.
+CALLS = [
+    ("fill", lambda display: display.fill(1), 208),
+    ("write_cmd", lambda display: display.write_cmd(adafruit_ssd1306.SET_CONTRAST), 224),
+    ("write_cmds", lambda display: display.write_cmds(b"\x81\x7f"), 224),
+    ("mark_dirty", lambda display: display.mark_dirty(10, 10, 40, 20), 144),
+    ("fill_rect", lambda display: display.fill_rect(3, 4, 20, 20, 1), 224),
+    ("show", lambda display: display.show(), 520),
+    ("partial show", partial, 552),
+]
+
+
+def transient(call, display):
+    """The memory call(display) uses on top of what it leaves allocated, the
+    least of a few runs so that the interpreter's own caches settle"""
+    least = None
+    for _ in range(5):
+        call(display)
+        kept, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call(display)
+        _, peak = tracemalloc.get_traced_memory()
+        least = peak - kept if least is None else min(least, peak - kept)
+    return least
+
+
+@pytest.mark.parametrize("make", [i2c, i2c_pages, i2c_shared, spi])
+@pytest.mark.parametrize("name, call, budget", CALLS, ids=[name for name, _, _ in CALLS])
+def test_calls_stay_within_the_interpreter_overhead(make, name, call, budget):
+    display = make()
+    tracemalloc.start()
+    try:
+        used = transient(call, display)
+    finally:
+        tracemalloc.stop()
+    assert used <= budget, name
+
+
+@pytest.mark.parametrize("make", [i2c, i2c_pages, i2c_shared, spi])
+def test_calls_make_no_buffers(make, monkeypatch):
+    display = make()
+    made = []
+
+    def counting(kind):
+        def construct(*args):
+            made.append(kind.__name__)
+            return kind(*args)
+
+        return construct
+
+    for kind in (bytearray, bytes, memoryview):
+        monkeypatch.setattr(adafruit_ssd1306, kind.__name__, counting(kind), raising=False)
+    for _, call, _ in CALLS:
+        call(display)
+    assert not made
+
+
+@pytest.mark.parametrize("make", [i2c, spi])
+def test_fill_lights_any_nonzero_color(make):
+    display = make()
+    display.fill(2)
+    assert bytes(display._fb) == b"\xff" * 1024
+    display.fill(0)
+    assert bytes(display._fb) == bytes(1024)
+    display.fill(1)
+    assert display.pixel(127, 63) == 1
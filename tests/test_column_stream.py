@@ -0,0 +1,38 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Streaming columns with vertical addressing"""
+
+import math
+
+import pytest
+from fakes import FakeI2C
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+@pytest.mark.parametrize("rotate", [None, False, True])
+@pytest.mark.parametrize("scroll", [False, True])
+def test_stream_matches_framebuffer(scroll, rotate):
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    if rotate is not None:
+        display.rotate(rotate)
+    stream = adafruit_ssd1306.ColumnStream(display, y=16, height=32, scroll=scroll)
+    for sample in range(200):
+        sent = len(bus.log)
+        stream.plot(math.sin(sample / 10), -1, 1, bar=sample % 2 == 0)
+    # a column costs a few command bytes and a byte per page
+    assert sum(len(write) for write in bus.log[sent:]) < 30
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.visible() == bytes(display._fb)
+    # drawing the usual way goes back to horizontal addressing
+    sent = len(bus.log)
+    display.fill_rect(0, 0, 10, 10, 1)
+    display.show()
+    panel.feed_i2c(bus.log[sent:])
+    assert panel.mode == 0x00
+    assert panel.visible() == bytes(display._fb)
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Effect timelines, and the display state they leave behind"""
+
+import time
+
+from fakes import FakeI2C
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+def test_steps_update_the_display_state():
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    effects = adafruit_ssd1306.Effects(display)
+    effects.contrast(255, 40, 1.0, steps=4).blink(1, 1.0).pulse(1, 1.0)
+    sent = len(bus.log)
+    assert effects.step(0.0) is not None
+    assert effects.step(1.2) is not None
+    # steps that fall due together go in one transaction
+    assert len(bus.log) == sent + 2
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.contrast == display._applied_contrast == 40
+    assert panel.inverted
+    # a blank screen inverted lights every pixel
+    assert display.load == 40 / 255
+    assert effects.step(2.2) is not None
+    assert not display.power
+    assert effects.step(3.0) is None
+    assert display.power
+    assert display.load == 0
+
+
+def test_steps_stay_within_the_power_budget():
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    display.fill(1)
+    display.show()
+    display.set_power_budget(0.25)
+    assert display._applied_contrast == 63
+    effects = adafruit_ssd1306.Effects(display).contrast(0, 255, 1.0, steps=2)
+    effects.step(0.0)
+    assert display._applied_contrast == 0
+    effects.step(1.0)
+    assert display._applied_contrast == 63
+    assert display.load <= 0.25
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.contrast == 63
+
+
+class SlowI2C(FakeI2C):
+    """An I2C bus that takes a moment to start each write, as a real one would"""
+
+    def writeto(self, addr, buf, *, start=0, end=None):
+        time.sleep(0.0005)
+        super().writeto(addr, buf, start=start, end=end)
+
+
+def test_a_thread_of_effects_alongside_updates():
+    bus = SlowI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    effects = adafruit_ssd1306.Effects(display).contrast(0, 255, 0.2, steps=255)
+    thread = effects.start_thread()
+    frame = 0
+    while thread.is_alive():
+        frame += 1
+        display.fill_rect(frame % 120, frame % 56, 8, 8, frame & 1)
+        display.show()
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.contrast == 255
+    assert panel.visible() == bytes(display._fb)
@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Layer compositing and save-under regions"""
+
+from fakes import FakeI2C
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+def composite(*layers):
+    pixels = bytearray(len(layers[0].buffer))
+    for layer in layers:
+        for index, byte in enumerate(layer.buffer):
+            if layer.op == adafruit_ssd1306.LAYER_AND:
+                pixels[index] &= byte
+            elif layer.op == adafruit_ssd1306.LAYER_XOR:
+                pixels[index] ^= byte
+            else:
+                pixels[index] |= byte
+    return bytes(pixels)
+
+
+def test_layers():
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    background = display.add_layer()
+    content = display.add_layer()
+    cursor = display.add_layer(adafruit_ssd1306.LAYER_XOR)
+    background.rect(0, 0, 128, 64, 1)
+    background.mark_dirty(0, 0, 128, 64)
+    content.fill_rect(10, 10, 40, 8, 1)
+    content.mark_dirty(10, 10, 40, 8)
+    display.show(partial=True)
+    assert bytes(display._fb) == composite(background, content)
+    cursor.fill_rect(8, 13, 40, 9, 1)
+    cursor.mark_dirty(8, 13, 40, 9)
+    sent = len(bus.log)
+    display.show(partial=True)
+    assert bytes(display._fb) == composite(background, content, cursor)
+    # only the columns under the cursor are sent
+    assert sum(len(write) for write in bus.log[sent:]) < 2 * 40 + 30
+    before = bytes(display._fb)
+    saved = content.save_region(30, 30, 60, 20)
+    content.fill_rect(30, 30, 60, 20, 1)
+    content.mark_dirty(30, 30, 60, 20)
+    display.show(partial=True)
+    content.restore_region(saved)
+    display.show(partial=True)
+    assert bytes(display._fb) == before
+    display.remove_layer(cursor)
+    display.show(partial=True)
+    assert bytes(display._fb) == composite(background, content)
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.visible() == bytes(display._fb)
@@ -0,0 +1,249 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""The i2c-dev and spidev transports, fed to fake device files"""
+
+import ctypes
+import struct
+
+import pytest
+from fakes import FakeI2C, FakePin, NullTransport
+
+import adafruit_ssd1306
+import adafruit_ssd1306_linux
+import adafruit_ssd1306_tools
+
+
+class FakeI2CFile:
+    """An i2c-dev file that decodes I2C_RDWR messages into writes"""
+
+    def __init__(self, nostart=False):
+        self.log = []
+        self.ioctls = 0
+        self.nostart = nostart
+
+    def ioctl(self, request, arg):
+        if request == 0x0705:
+            if not self.nostart:
+                raise OSError(25, "I2C_FUNCS not supported")
+            struct.pack_into("L", arg, 0, 0x10)
+            return
+        assert request == 0x0707
+        self.ioctls += 1
+        msgs, count = struct.unpack("PI", bytes(arg))
+        size = struct.calcsize("HHHP")
+        for index in range(count):
+            addr, flags, length, buf = struct.unpack_from(
+                "HHHP", ctypes.string_at(msgs, size * count), index * size
+            )
+            assert addr == 0x3C
+            data = ctypes.string_at(buf, length)
+            if flags & 0x4000:
+                # I2C_M_NOSTART continues the previous message
+                self.log[-1] += data
+            else:
+                self.log.append(data)
+
+
+class FakeSPIFile:
+    """A spidev file that decodes SPI_IOC_MESSAGE transfers into writes"""
+
+    def __init__(self, dc):
+        self.log = []
+        self.dc = dc
+
+    def ioctl(self, request, arg):
+        if request in {0x40016B01, 0x40046B04}:
+            return
+        for index in range((request >> 16 & 0x3FFF) // 32):
+            buf, _, length, _ = struct.unpack_from("=QQII", arg, index * 32)
+            self.log.append((self.dc.value, ctypes.string_at(buf, length)))
+
+
+@pytest.mark.parametrize("nostart", [False, True])
+@pytest.mark.parametrize("page_addressing", [False, True])
+def test_i2c(nostart, page_addressing):
+    file = FakeI2CFile(nostart)
+    transport = adafruit_ssd1306_linux.LinuxI2CTransport(file=file)
+    assert transport.vectored == nostart
+    display = adafruit_ssd1306.SSD1306_I2C(
+        64, 32, None, transport=transport, page_addressing=page_addressing
+    )
+    sent = len(file.log)
+    ioctls = file.ioctls
+    display.fill_rect(5, 5, 40, 20, 1)
+    display.line(0, 31, 63, 0, 1)
+    display.show()
+    # the address window and the data of a page go in one ioctl, as one
+    # gathered message or as two chained ones
+    pages = 4 if page_addressing else 1
+    assert file.ioctls - ioctls == pages
+    assert len(file.log) - sent == pages if nostart else 2 * pages
+    panel = adafruit_ssd1306_tools.PanelEmulator(4)
+    panel.feed_i2c(file.log)
+    assert panel.visible(64) == bytes(display.buffer[1:])
+
+
+def test_spi():
+    dc = FakePin()
+    file = FakeSPIFile(dc)
+    transport = adafruit_ssd1306_linux.LinuxSPITransport(file=file)
+    display = adafruit_ssd1306.SSD1306_SPI(128, 32, None, dc, None, None, transport=transport)
+    display.fill_rect(5, 5, 40, 20, 1)
+    display.show()
+    panel = adafruit_ssd1306_tools.PanelEmulator(4)
+    panel.feed_spi(file.log)
+    assert panel.visible() == bytes(display.buffer)
+
+
+def test_shared_framebuffer(tmp_path):
+    path = str(tmp_path / "ssd1306")
+    owner = adafruit_ssd1306_linux.SharedFrameBuffer(path, 128, 64, create=True)
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus, buffer=owner.buffer)
+    assert owner.flush(display)
+    assert not owner.flush(display)
+    renderer = adafruit_ssd1306_linux.SharedFrameBuffer(path)
+    renderer.framebuffer().fill_rect(0, 16, 128, 8, 1)
+    renderer.commit(16, 8)
+    sent = len(bus.log)
+    assert owner.flush(display)
+    # only the committed page is sent
+    assert sum(len(write) for write in bus.log[sent:]) < 200
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.visible() == bytes(owner.pixels)
+    assert panel.visible()[256:384] == b"\xff" * 128
+    del display
+    renderer.close()
+
+
+class CheckingI2C(FakeI2C):
+    """A bus that checks that the pixels are untouched while they are sent"""
+
+    def __init__(self, pixels):
+        super().__init__()
+        self.pixels = pixels
+        self.expected = None
+
+    def writeto(self, addr, buf, *, start=0, end=None):
+        if self.expected is not None:
+            assert bytes(self.pixels) == self.expected
+        super().writeto(addr, buf, start=start, end=end)
+
+
+def test_shared_pixels_are_only_read(tmp_path):
+    owner = adafruit_ssd1306_linux.SharedFrameBuffer(
+        str(tmp_path / "ssd1306"), 128, 64, create=True
+    )
+    bus = CheckingI2C(owner.pixels)
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus, buffer=owner.buffer)
+    owner.flush(display)
+    renderer = adafruit_ssd1306_linux.SharedFrameBuffer(str(tmp_path / "ssd1306"))
+    renderer.framebuffer().fill_rect(10, 12, 100, 30, 1)
+    renderer.commit(12, 30)
+    bus.expected = bytes(owner.pixels)
+    sent = len(bus.log)
+    owner.flush(display)
+    assert len(bus.log) > sent
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.visible() == bus.expected
+    del display
+    renderer.close()
+
+
+def test_shared_pixels_chained(tmp_path):
+    path = str(tmp_path / "ssd1306")
+    owner = adafruit_ssd1306_linux.SharedFrameBuffer(path, 128, 64, create=True)
+    pixels = owner.pixels
+
+    class CheckingFile(FakeI2CFile):
+        expected = None
+
+        def ioctl(self, request, arg):
+            if self.expected is not None:
+                assert bytes(pixels) == self.expected
+            super().ioctl(request, arg)
+
+    file = CheckingFile()
+    transport = adafruit_ssd1306_linux.LinuxI2CTransport(file=file)
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=transport, buffer=owner.buffer)
+    owner.flush(display)
+    renderer = adafruit_ssd1306_linux.SharedFrameBuffer(path)
+    renderer.framebuffer().fill_rect(10, 20, 100, 4, 1)
+    renderer.commit(20, 4)
+    file.expected = bytes(pixels)
+    ioctls = file.ioctls
+    owner.flush(display)
+    # a page fits the staging buffer, so its window and data are chained
+    assert file.ioctls - ioctls == 1
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(file.log)
+    assert panel.visible() == file.expected
+    del display, pixels
+    renderer.close()
+
+
+def test_animation_player(tmp_path):
+    image = pytest.importorskip("PIL.Image")
+    draw = pytest.importorskip("PIL.ImageDraw")
+    frames = []
+    for index in range(6):
+        frame = image.new("L", (128, 64))
+        draw.Draw(frame).rectangle((index * 10, 5, index * 10 + 20, 40), fill=255)
+        frames.append(frame.convert("P"))
+    path = str(tmp_path / "animation.gif")
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=10, loop=0)
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    player = adafruit_ssd1306_linux.AnimationPlayer(display, image.open(path), cache_size=10)
+    player.play(frames=14)
+    player.close()
+    # the second time round every frame comes from the cache
+    assert player.decoded == 6
+    assert player.cache_hits >= 6
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.visible() == bytes(display.buffer[1:])
+
+
+def test_animation_player_loops_an_iterable():
+    image = pytest.importorskip("PIL.Image")
+    draw = pytest.importorskip("PIL.ImageDraw")
+
+    def frames():
+        for index in range(6):
+            frame = image.new("1", (128, 64))
+            draw.Draw(frame).rectangle((index * 10, 5, index * 10 + 20, 40), fill=1)
+            yield frame
+
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    player = adafruit_ssd1306_linux.AnimationPlayer(display, frames(), cache_size=3, duration=0.001)
+    shown = []
+    for _ in range(12):
+        assert player.step()
+        shown.append(bytes(display.buffer[1:]))
+    player.close()
+    # the iterable is read once, then the frames still cached are replayed
+    assert player.decoded == 6
+    assert shown[6:9] == shown[3:6]
+    assert shown[9:12] == shown[3:6]
+
+
+def test_animation_player_raises_errors_of_the_source():
+    image = pytest.importorskip("PIL.Image")
+
+    def frames():
+        yield image.new("1", (128, 64))
+        raise ValueError("corrupt frame")
+
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=NullTransport())
+    player = adafruit_ssd1306_linux.AnimationPlayer(display, frames(), duration=0.001)
+    assert player.step()
+    with pytest.raises(ValueError, match="corrupt frame"):
+        player.step()
+    assert not player.step()
+    player.close()
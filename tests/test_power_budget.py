@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Counting lit pixels for the power budget"""
+
+import random
+
+from fakes import NullTransport
+
+import adafruit_ssd1306
+
+
+def test_lit_pixels_follow_partial_updates():
+    random.seed(48)
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=NullTransport())
+    display.set_power_budget(1.0)
+    for _ in range(20):
+        x = random.randrange(128)
+        y = random.randrange(64)
+        display.fill_rect(x, y, 20, 12, random.randrange(2))
+        display.mark_dirty(x, y, 20, 12)
+        display.show(partial=True)
+        expected = sum(bin(byte).count("1") for byte in display._fb)
+        assert display.lit_pixels == expected
@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Scrolling the framebuffer, checked against framebuf's pixel by pixel scroll,
+and moving the image on the panel"""
+
+import random
+
+import adafruit_framebuf
+import pytest
+from fakes import NullTransport, RecordingTransport
+
+import adafruit_ssd1306
+
+
+@pytest.mark.parametrize("width, height", [(128, 64), (64, 32), (96, 16)])
+def test_scroll_matches_framebuf(width, height):
+    random.seed(width + height)
+    display = adafruit_ssd1306.SSD1306_I2C(width, height, None, transport=NullTransport())
+    pages = height // 8
+    for _ in range(150):
+        data = bytes(random.randrange(256) for _ in range(width * pages))
+        delta_x = random.choice([0, random.randint(-width, width)])
+        delta_y = random.choice([0, 8, -16, random.randint(-height, height)])
+        display._fb[:] = data
+        display.show(partial=True)
+        display.scroll(delta_x, delta_y)
+        expected = adafruit_framebuf.FrameBuffer(
+            bytearray(data), width, height, adafruit_framebuf.MVLSB
+        )
+        if abs(delta_x) < width and abs(delta_y) < height:
+            adafruit_framebuf.FrameBuffer.scroll(expected, delta_x, delta_y)
+        assert bytes(display._fb) == bytes(expected.buf), (delta_x, delta_y)
+        # everything that changed is marked to be sent
+        for page in range(pages):
+            for x in range(width):
+                if display._fb[page * width + x] != data[page * width + x]:
+                    assert display._dirty_first[page] <= x <= display._dirty_last[page]
+
+
+def test_orbit_clears_the_hidden_rows_once():
+    transport = RecordingTransport()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 32, None, transport=transport)
+    transport.log.clear()
+    # the rows below the display are blanked the first time they come into view
+    display.orbit()
+    assert sum(len(write) for write in transport.log) > 512
+    for _ in range(10):
+        transport.log.clear()
+        display.orbit()
+        # after that each step only sets the start line
+        start_line = adafruit_ssd1306.SET_DISP_START_LINE | (-display.offset[1] & 0x3F)
+        assert transport.log == [bytes((0x00, start_line))]
@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Text drawn from cached strips, checked against PIL drawing it directly"""
+
+import pytest
+from fakes import NullTransport
+
+import adafruit_ssd1306
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+ImageFont = pytest.importorskip("PIL.ImageFont")
+
+
+def reference(parts):
+    """The framebuffer of PIL drawing each (string, x, y, font)"""
+    image = Image.new("1", (128, 64))
+    draw = ImageDraw.Draw(image)
+    for string, x, y, font in parts:
+        draw.text((x, y), string, font=font, fill=1)
+    pixels = bytearray(1024)
+    adafruit_ssd1306._image1_to_vlsb(image, pixels)
+    return bytes(pixels)
+
+
+@pytest.mark.parametrize("string", ["jfy", "Wave", "fj,", "01:23"])
+@pytest.mark.parametrize("size", [11, 20])
+def test_matches_pil(string, size):
+    font = ImageFont.load_default(size=size)
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=NullTransport())
+    cache = adafruit_ssd1306.TextCache(display)
+    for _ in range(2):
+        display.fill(0)
+        advance = cache.text(string, 3, 5, font)
+        assert bytes(display._fb) == reference([(string, 3, 5, font)])
+    assert cache.hits == 1
+    assert advance == int(font.getlength(string) + 0.5)
+    # character by character, each at the advance of those before it
+    display.fill(0)
+    cache.text(string, 3, 20, font, glyphs=True)
+    parts = []
+    x = 3
+    for char in string:
+        parts.append((char, x, 20, font))
+        x += int(font.getlength(char) + 0.5)
+    assert bytes(display._fb) == reference(parts)
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""The command line tools"""
+
+import argparse
+
+import pytest
+from fakes import FakeI2C
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+def test_compile(tmp_path):
+    image = pytest.importorskip("PIL.Image")
+    draw = pytest.importorskip("PIL.ImageDraw")
+    full = image.new("L", (128, 64))
+    draw.Draw(full).ellipse((10, 5, 100, 60), fill=255)
+    full.save(tmp_path / "full.png")
+    sheet = image.new("1", (30, 20))
+    draw.Draw(sheet).rectangle((2, 2, 12, 8), fill=1)
+    draw.Draw(sheet).line((15, 0, 29, 19), fill=1)
+    sheet.save(tmp_path / "sheet.png")
+    pack_path = str(tmp_path / "assets.bin")
+    adafruit_ssd1306_tools.main(
+        [
+            "compile",
+            pack_path,
+            str(tmp_path / "full.png"),
+            f"sprite={tmp_path / 'sheet.png'}:15x10",
+        ]
+    )
+    pack = adafruit_ssd1306.AssetPack(pack_path)
+    assert pack.size("full") == (128, 64, 1)
+    assert pack.size("sprite") == (15, 10, 4)
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, FakeI2C())
+    pack.blit(display, "full")
+    assert display.pixel(55, 32) == 1
+    assert display.pixel(0, 0) == 0
+    display.fill(0)
+    pack.blit(display, "sprite", 5, 3, frame=3)
+    frame = sheet.crop((15, 10, 30, 20))
+    for y in range(10):
+        for x in range(15):
+            assert bool(display.pixel(5 + x, 3 + y)) == bool(frame.getpixel((x, y)))
+    pack.close()
+
+
+@pytest.mark.parametrize("frame_format", ["vlsb", "mono", "gray"])
+def test_stream(tmp_path, frame_format):
+    width, height = 128, 64
+    frames = [
+        bytes((x * y + index) & 0x80 and 255 for y in range(height) for x in range(width))
+        for index in range(4)
+    ]
+    with open(tmp_path / "frames", "wb") as file:
+        for gray in frames:
+            if frame_format == "gray":
+                file.write(gray)
+            elif frame_format == "vlsb":
+                file.write(adafruit_ssd1306._gray_to_vlsb(gray, width, height, 0, 128))
+            else:
+                file.write(
+                    bytes(
+                        sum((gray[y * width + x + bit] >= 128) << (7 - bit) for bit in range(8))
+                        for y in range(height)
+                        for x in range(0, width, 8)
+                    )
+                )
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(width, height, bus)
+    args = argparse.Namespace(
+        input=str(tmp_path / "frames"), format=frame_format, dither=0, threshold=128, stats=0
+    )
+    adafruit_ssd1306_tools._stream(args, display)
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(bus.log)
+    assert panel.visible() == bytes(
+        adafruit_ssd1306._gray_to_vlsb(frames[-1], width, height, 0, 128)
+    )
@@ -0,0 +1,55 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Bus traces, replayed into the panel emulator"""
+
+import pytest
+from fakes import GatheringTransport, NullTransport
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+@pytest.mark.parametrize("width, height, page_addressing", [(128, 64, False), (64, 32, True)])
+def test_replay_of_a_tracer_attached_later(tmp_path, width, height, page_addressing):
+    path = str(tmp_path / "trace.jsonl")
+    display = adafruit_ssd1306.SSD1306_I2C(
+        width, height, None, transport=NullTransport(), page_addressing=page_addressing
+    )
+    display.rotate(True)
+    display.show()
+    # the addressing was set up before tracing began
+    display.tracer = adafruit_ssd1306.BusTracer(path)
+    display.fill_rect(5, 5, 60, 30, 1)
+    display.line(0, height - 1, width - 1, 0, 1)
+    display.show()
+    if not page_addressing:
+        stream = adafruit_ssd1306.ColumnStream(display, y=40, height=16, scroll=True)
+        for sample in range(40):
+            stream.plot(sample % 9, 0, 8)
+    display.tracer.close()
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.replay(path)
+    assert panel.visible(width, height) == bytes(display._fb)
+    stats = adafruit_ssd1306_tools._trace_stats(path)
+    assert stats["frames"] == 1
+
+
+def test_one_event_per_gathered_transaction(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    transport = GatheringTransport()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=transport)
+    display.tracer = adafruit_ssd1306.BusTracer(path)
+    transport.log.clear()
+    display.fill_rect(5, 5, 60, 30, 1)
+    display.show()
+    display.fill_rect(20, 50, 10, 10, 1)
+    display.mark_dirty(20, 50, 10, 10)
+    display.show(partial=True)
+    display.tracer.close()
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.replay(path)
+    assert panel.visible() == bytes(display._fb)
+    stats = adafruit_ssd1306_tools._trace_stats(path)
+    assert stats["transactions"] == len(transport.log)
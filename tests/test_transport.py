@@ -0,0 +1,30 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Commands and data through transports that gather buffers"""
+
+from fakes import GatheringTransport
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+def test_commands_after_a_gathered_window():
+    transport = GatheringTransport()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=transport)
+    display.fill_rect(3, 3, 50, 20, 1)
+    display.show()
+    # the window and data of the frame went out as one write
+    assert transport.log[-1][:2] == b"\x80\x21"
+    display.write_cmds(bytes((adafruit_ssd1306.SET_CONTRAST, 0x20)))
+    assert transport.log[-1] == b"\x00\x81\x20"
+    display.set_timing(divide=2)
+    stream = adafruit_ssd1306.ColumnStream(display, y=32, height=16)
+    for sample in range(20):
+        stream.plot(sample % 5, 0, 4)
+    display.show()
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    panel.feed_i2c(transport.log)
+    assert panel.contrast == 0x20
+    assert panel.visible() == bytes(display._fb)
@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: 2026 Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""Retained widgets, checked with a model of the panel after each partial show"""
+
+import random
+
+import pytest
+from fakes import FakeI2C, NullTransport
+
+import adafruit_ssd1306
+import adafruit_ssd1306_tools
+
+
+@pytest.fixture
+def font(tmp_path, monkeypatch):
+    """A made up font5x8.bin in the working directory, where framebuf looks"""
+    glyphs = bytes((code * 7 + column * 31) & 0xFF for code in range(256) for column in range(5))
+    (tmp_path / "font5x8.bin").write_bytes(bytes((5, 8)) + glyphs)
+    monkeypatch.chdir(tmp_path)
+
+
+def test_partial_updates_match_the_framebuffer(font):
+    random.seed(39)
+    bus = FakeI2C()
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, bus)
+    label = adafruit_ssd1306.Label(display, 0, 0, "CPU", chars=10)
+    bar = adafruit_ssd1306.ProgressBar(display, 0, 10, 60, 8, 0.2)
+    gauge = adafruit_ssd1306.Gauge(display, 70, 2, 20, 0.5)
+    sparkline = adafruit_ssd1306.Sparkline(display, 0, 30, 50, 20, maximum=10)
+    icon = adafruit_ssd1306.Icon(display, 100, 40, 8, 16, [b"\xaa" * 16, b"\x55" * 16])
+    display.show()
+    panel = adafruit_ssd1306_tools.PanelEmulator()
+    for frame in range(50):
+        label.value = f"CPU {random.randrange(100)}%"
+        bar.value = random.random()
+        gauge.value = random.random()
+        sparkline.push(random.randrange(10))
+        icon.value = frame & 1
+        display.show(partial=True)
+        panel.feed_i2c(bus.log)
+        bus.log.clear()
+        assert panel.visible() == bytes(display._fb), frame
+    # an unchanged value sends nothing
+    label.value = label.value
+    display.show(partial=True)
+    assert not bus.log
+
+
+def test_labels_fit_the_micropython_font(monkeypatch):
+    display = adafruit_ssd1306.SSD1306_I2C(128, 64, None, transport=NullTransport())
+    drawn = []
+
+    def text(string, x, y, color):
+        """MicroPython's framebuf text, which has no size"""
+        drawn.append(string)
+
+    monkeypatch.setattr(adafruit_ssd1306, "_NATIVE_FRAMEBUF", True)
+    monkeypatch.setattr(display, "text", text)
+    label = adafruit_ssd1306.Label(display, 0, 0, "12345678", chars=8)
+    # room for eight 8x8 characters
+    assert label.width == 64
+    assert drawn == ["12345678"]
+    with pytest.raises(ValueError):
+        adafruit_ssd1306.Label(display, 0, 10, "big", size=2)